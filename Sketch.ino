@@ -55,6 +55,20 @@ unsigned long debounceDelay = 50;
 int threshold1 = 40;
 int threshold2 = 60;
 
+// Uncomment the line below to stream raw ADC readings and leave filtering and
+// envelope detection to the host (set HOST_FILTER = True in main.py to match)
+// #define RAW_STREAM
+
+// Uncomment the line below to stream compact binary frames instead of ASCII
+// (set SERIAL_FORMAT = "binary" in main.py to match)
+// #define BINARY_FRAMES
+
+// Binary frame: sync | seq | NUM_CHANNELS x int16 (little-endian) | checksum
+#define SYNC_BYTE 0xA5
+#define NUM_CHANNELS 2
+#define FRAME_SIZE (3 + 2 * NUM_CHANNELS)
+uint8_t frame_seq = 0;
+
 void setup() {
   // Serial connection begin
   Serial.begin(BAUD_RATE);
@@ -108,26 +122,37 @@ void loop() {
     timer += 1000000 / SAMPLE_RATE;
     // RAW EMG
     int sensor_value1 = analogRead(INPUT_PIN1);
-   
-    // Filtered EMG
-    int signal1 = EMGFilter1(sensor_value1);
-   
-    // EMG envelope
-    int envelope1 = getEnvelope1(abs(signal1));
     int sensor_value2 = analogRead(INPUT_PIN2);
-   
-    // Filtered EMG
-    int signal2 = EMGFilter2(sensor_value2);
-   
-    // EMG envelope
-    int envelope2 = getEnvelope2(abs(signal2));
+
+    #ifdef RAW_STREAM
+      // Host does the filtering and envelope detection
+      int envelope1 = sensor_value1;
+      int envelope2 = sensor_value2;
+    #else
+      // Filtered EMG
+      int signal1 = EMGFilter1(sensor_value1);
+     
+      // EMG envelope
+      int envelope1 = getEnvelope1(abs(signal1));
+     
+      // Filtered EMG
+      int signal2 = EMGFilter2(sensor_value2);
+     
+      // EMG envelope
+      int envelope2 = getEnvelope2(abs(signal2));
+    #endif
 
     // If set to calibrate show envelope data on serial monitor/plotter
     #ifdef Calibrate
     
-      Serial.print(envelope1);
-      Serial.print('\t');
-      Serial.println(envelope2);
+      #ifdef BINARY_FRAMES
+        int values[NUM_CHANNELS] = {envelope1, envelope2};
+        sendFrame(values);
+      #else
+        Serial.print(envelope1);
+        Serial.print('\t');
+        Serial.println(envelope2);
+      #endif
     
     #endif
 
@@ -137,6 +162,21 @@ void loop() {
  lastButtonState = reading;
 }
 
+// Send one binary frame; the checksum is the 8-bit sum of seq and data bytes
+void sendFrame(int *values) {
+  uint8_t frame[FRAME_SIZE];
+  frame[0] = SYNC_BYTE;
+  frame[1] = frame_seq++;
+  uint8_t checksum = frame[1];
+  for (int i = 0; i < NUM_CHANNELS; i++) {
+    frame[2 + 2 * i] = values[i] & 0xFF;
+    frame[3 + 2 * i] = (values[i] >> 8) & 0xFF;
+    checksum += frame[2 + 2 * i] + frame[3 + 2 * i];
+  }
+  frame[FRAME_SIZE - 1] = checksum;
+  Serial.write(frame, FRAME_SIZE);
+}
+
 // Envelope detection algorithm
 // Get CH1 envelope
 int getEnvelope1(int abs_emg){
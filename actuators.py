@@ -0,0 +1,276 @@
+import json
+import socket
+import time
+from collections import deque
+
+# ===============================
+# Output Actuators
+# ===============================
+# Gesture events leave the pipeline's actuator thread through one of these
+# backends:
+#   keyboard  key presses through the `keyboard` package (root on Linux)
+#   uinput    a virtual keyboard device through python-evdev; needs write
+#             access to /dev/uinput but not root
+#   udp       JSON datagrams to a local port, for games and other programs
+#   memory    kept in a bounded list, for tests and benchmarks
+# Events are (event, key, action, time): "tap", "press" or "release", the
+# mapped key, the action name, and the time of the sample that triggered it.
+# The Dispatcher in front of a backend gets every event queued since its last
+# call as one batch, coalesces repeats and rate-limits taps per key, and
+# hands the rest to the backend in a single send().
+
+TAP_INTERVAL = 0.05         # Seconds between taps of one key; faster ones are coalesced
+UDP_TARGET = ("127.0.0.1", 5005)
+MEMORY_EVENTS = 100_000     # Events kept by the memory backend
+
+# `keyboard` key names whose evdev code is not just "KEY_" + name.upper()
+UINPUT_KEYS = {
+    "page up": "KEY_PAGEUP",
+    "page down": "KEY_PAGEDOWN",
+    "print screen": "KEY_SYSRQ",
+    "scroll lock": "KEY_SCROLLLOCK",
+    "caps lock": "KEY_CAPSLOCK",
+    "num lock": "KEY_NUMLOCK",
+    "shift": "KEY_LEFTSHIFT",
+    "ctrl": "KEY_LEFTCTRL",
+    "alt": "KEY_LEFTALT",
+    "alt gr": "KEY_RIGHTALT",
+    "menu": "KEY_COMPOSE",
+    "numpad enter": "KEY_KPENTER",
+    "numpad *": "KEY_KPASTERISK",
+    "numpad +": "KEY_KPPLUS",
+    "numpad -": "KEY_KPMINUS",
+    "numpad /": "KEY_KPSLASH",
+    **{f"numpad {n}": f"KEY_KP{n}" for n in range(10)},
+}
+
+
+class KeyboardActuator:
+    """
+    Key presses through the `keyboard` package, imported when the session
+    starts. Looking the keys up there also brings up its key device, so
+    missing root on Linux shows up then rather than on the first gesture.
+    """
+
+    def __init__(self):
+        self.keyboard = None
+
+    def check(self, keys):
+        try:
+            import keyboard
+            for key in keys:
+                keyboard.key_to_scan_codes(key)
+        except (ImportError, OSError) as e:
+            # Not installed, or not running as root on Linux
+            raise RuntimeError(f"Keyboard backend unavailable: {e}") from e
+        self.keyboard = keyboard
+
+    def send(self, events):
+        keyboard = self.keyboard
+        for event, key, _, _ in events:
+            if event == "press":
+                keyboard.press(key)
+            elif event == "release":
+                keyboard.release(key)
+            else:
+                keyboard.press_and_release(key)
+
+    def close(self):
+        pass
+
+
+class UinputActuator:
+    """
+    Virtual keyboard through /dev/uinput (python-evdev). Keys use the
+    `keyboard` names ("space", "left", "a"); the device is created by check()
+    when the session starts and removed by close().
+    """
+
+    def __init__(self, name="emg-gesture-control"):
+        self.name = name
+        self.device = None
+        self._codes = {}
+
+    def check(self, keys):
+        """
+        Resolve every key to its evdev code, then create the device if it is
+        not open yet. Raises ValueError for unknown keys, RuntimeError if
+        evdev is missing or the device cannot be created.
+        """
+        try:
+            from evdev import UInput, UInputError, ecodes
+        except ImportError as e:
+            raise RuntimeError("The uinput backend needs python-evdev (pip install evdev)") from e
+        unknown = []
+        for key in keys:
+            code = ecodes.ecodes.get(UINPUT_KEYS.get(key, "KEY_" + key.upper()))
+            if code is None:
+                unknown.append(key)
+            else:
+                self._codes[key] = code
+        if unknown:
+            raise ValueError("No uinput key code for: " + ", ".join(unknown))
+        if self.device is None:
+            try:
+                self.device = UInput(name=self.name)
+            except (OSError, UInputError) as e:
+                raise RuntimeError(f"Cannot create the uinput device (write access to /dev/uinput?): {e}") from e
+
+    def send(self, events):
+        from evdev import ecodes
+        for event, key, _, _ in events:
+            code = self._codes.get(key)
+            if code is None:
+                # Keys are checked when the session starts
+                continue
+            if event != "release":
+                self.device.write(ecodes.EV_KEY, code, 1)
+            if event == "tap":
+                # The press must reach readers before the release does
+                self.device.syn()
+            if event != "press":
+                self.device.write(ecodes.EV_KEY, code, 0)
+        self.device.syn()
+
+    def close(self):
+        if self.device is not None:
+            self.device.close()
+            self.device = None
+
+
+class UDPActuator:
+    """
+    One JSON datagram per batch to `address`:
+    {"events": [{"event", "key", "action", "time"}, ...], "sent": unix time}.
+    Never blocks; a datagram the socket cannot take is counted as dropped.
+    """
+
+    def __init__(self, address=UDP_TARGET):
+        self.address = tuple(address)
+        self.sock = None
+        self.dropped = 0
+
+    def check(self, keys):
+        pass
+
+    def send(self, events):
+        if self.sock is None:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.setblocking(False)
+        payload = {
+            "events": [{"event": event, "key": key, "action": action, "time": t}
+                       for event, key, action, t in events],
+            "sent": time.time(),
+        }
+        try:
+            self.sock.sendto(json.dumps(payload).encode(), self.address)
+        except OSError:
+            # Full buffer, or nothing listening (ICMP port unreachable)
+            self.dropped += len(events)
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+class MemoryActuator:
+    """Keeps (event, key, action, time, received_ns) for tests and benchmarks."""
+
+    def __init__(self, capacity=MEMORY_EVENTS):
+        self.events = deque(maxlen=capacity)
+
+    def check(self, keys):
+        pass
+
+    def send(self, events):
+        received = time.perf_counter_ns()
+        self.events.extend(event + (received,) for event in events)
+
+    def close(self):
+        pass
+
+
+ACTUATORS = {
+    "keyboard": KeyboardActuator,
+    "uinput": UinputActuator,
+    "udp": UDPActuator,
+    "memory": MemoryActuator,
+}
+
+
+class Dispatcher:
+    """
+    Coalescing, rate-limited front end for a backend. Only the actuator
+    thread calls dispatch(), so the reader and DSP stages never wait on it.
+    """
+
+    def __init__(self, backend, tap_interval=TAP_INTERVAL):
+        self.backend = backend
+        self.tap_interval = tap_interval
+        self.reset()
+
+    def reset(self):
+        self._last_tap = {}     # key -> sample time of its last tap sent
+        self._down = set()      # Keys pressed and not yet released
+        self.received = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.largest_batch = 0
+
+    def dispatch(self, events):
+        """Send a batch of (event, key, action, time); returns how many went out."""
+        self.received += len(events)
+        kept = []
+        for item in events:
+            event, key, _, t = item
+            if event == "tap":
+                # Rate limit on the sample clock, so it does not depend on
+                # how the events happened to be batched
+                if t - self._last_tap.get(key, float("-inf")) < self.tap_interval:
+                    continue
+                self._last_tap[key] = t
+            elif (event == "press") == (key in self._down):
+                # Already down / already up
+                continue
+            elif event == "press":
+                self._down.add(key)
+            else:
+                self._down.discard(key)
+            kept.append(item)
+        self.coalesced += len(events) - len(kept)
+        if kept:
+            self.backend.send(kept)
+            self.sent += len(kept)
+            self.batches += 1
+            self.largest_batch = max(self.largest_batch, len(kept))
+        return len(kept)
+
+    def check_keys(self, keys):
+        """
+        Open the backend if needed and check it can send these keys; raises
+        ValueError for a key it cannot send, RuntimeError if it cannot open.
+        """
+        self.backend.check(set(keys))
+
+    def close(self):
+        self.backend.close()
+
+    def stats(self):
+        return {
+            "backend": type(self.backend).__name__,
+            "received": self.received,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "largest_batch": self.largest_batch,
+            "dropped": getattr(self.backend, "dropped", 0),
+        }
+
+
+def make_dispatcher(kind="keyboard", tap_interval=TAP_INTERVAL, **options):
+    """Dispatcher over the backend named `kind` (see ACTUATORS); options go to the backend."""
+    if kind not in ACTUATORS:
+        raise ValueError(f"Unknown actuator backend: {kind}")
+    return Dispatcher(ACTUATORS[kind](**options), tap_interval=tap_interval)
@@ -0,0 +1,206 @@
+import json
+import os
+import time
+
+import numpy as np
+
+# ===============================
+# Session Archive
+# ===============================
+# Append-only, column-per-file layout for hours of EMG:
+#
+#   <path>/header.json    channels, sample rate, column types
+#   <path>/raw.bin        int16   (N, channels)
+#   <path>/envelope.bin   float32 (N, channels)
+#   <path>/output.bin     int8    (N,)   decision, 0 = none
+#   <path>/index.bin      (position, sample, time) at every chunk start and
+#                         after every gap in the sample counter
+#   <path>/events.bin     (sample, event, action) gesture key events
+#
+# Columns are fixed-width, so any range is opened with np.memmap and
+# sliced without reading the rest of the file. A crash can at worst leave
+# a partial last write, which readers ignore by only trusting the shortest
+# column.
+
+ARCHIVE_CHUNK = 1 << 16     # Samples between time index entries (~2 minutes at 500 Hz)
+ARCHIVE_BLOCK = 4096        # Default samples per block when iterating
+
+COLUMNS = {"raw": "<i2", "envelope": "<f4", "output": "i1"}
+INDEX_DTYPE = np.dtype([("position", "<i8"), ("sample", "<i8"), ("time", "<f8")])
+EVENT_DTYPE = np.dtype([("sample", "<i8"), ("event", "i1"), ("action", "i1")])
+EVENT_CODES = {"tap": 1, "press": 2, "release": 3}
+
+
+class ArchiveWriter:
+    """Appends blocks to an archive; used by SessionRecorder's flush thread."""
+
+    def __init__(self, path, channels=2, sample_rate=500, chunk=ARCHIVE_CHUNK):
+        self.path = path
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.chunk = chunk
+        self.position = 0           # Samples written
+        self._next_sample = None    # Sample counter expected next
+        self._files = {}
+
+    def open(self):
+        """
+        Create the archive directory. An existing one is never appended to:
+        "-2", "-3", ... is added to the name instead, and `path` updated.
+        """
+        parent, base = os.path.split(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        suffix = 1
+        while True:
+            try:
+                os.mkdir(self.path)
+                break
+            except FileExistsError:
+                suffix += 1
+                self.path = os.path.join(parent, f"{base}-{suffix}")
+        header = {
+            "version": 1,
+            "channels": self.channels,
+            "sample_rate": self.sample_rate,
+            "chunk": self.chunk,
+            "columns": COLUMNS,
+            "started": time.time(),
+        }
+        with open(os.path.join(self.path, "header.json"), "w") as f:
+            json.dump(header, f)
+        for name in list(COLUMNS) + ["index", "events"]:
+            self._files[name] = open(os.path.join(self.path, name + ".bin"), "xb")
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+    def append(self, sample, times, raw, env, outputs):
+        """
+        Append n samples: `sample` is the recorder's counter for the first one
+        (jumps mark dropped samples) and `times` the per-sample arrival time.
+        """
+        n = len(raw)
+        if n == 0:
+            return
+        # Index entries where a chunk starts or the sample counter jumps
+        starts = np.arange(-self.position % self.chunk, n, self.chunk)
+        if sample != self._next_sample:
+            # First block, or samples were dropped before this one
+            starts = np.union1d([0], starts)
+        if len(starts):
+            entries = np.zeros(len(starts), dtype=INDEX_DTYPE)
+            entries["position"] = self.position + starts
+            entries["sample"] = sample + starts
+            entries["time"] = times[starts]
+            entries.tofile(self._files["index"])
+        np.clip(raw, -32768, 32767).astype(COLUMNS["raw"]).tofile(self._files["raw"])
+        np.asarray(env, dtype=COLUMNS["envelope"]).tofile(self._files["envelope"])
+        np.asarray(outputs, dtype=COLUMNS["output"]).tofile(self._files["output"])
+        self.position += n
+        self._next_sample = sample + n
+
+    def append_events(self, events):
+        """events: [(sample, event name, action name)] as from the gesture state machine."""
+        if not events:
+            return
+        rows = np.zeros(len(events), dtype=EVENT_DTYPE)
+        rows["sample"] = [sample for sample, _, _ in events]
+        rows["event"] = [EVENT_CODES[event] for _, event, _ in events]
+        rows["action"] = [int(action[len("action"):]) for _, _, action in events]
+        rows.tofile(self._files["events"])
+
+    def flush(self):
+        for f in self._files.values():
+            f.flush()
+
+
+class Archive:
+    """
+    Read side of an archive. Columns are np.memmap views, so slicing only
+    reads the pages it touches: archive["raw"][a:b], archive.between(t0, t1).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "header.json")) as f:
+            self.header = json.load(f)
+        self.channels = self.header["channels"]
+        self.sample_rate = self.header["sample_rate"]
+        self._columns = {}
+        # Only trust what every column has in full
+        self.length = min(self._rows(name) for name in COLUMNS)
+        index = self._table("index", INDEX_DTYPE)
+        self.index = index[index["position"] < self.length]
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, name):
+        column = self._columns.get(name)
+        if column is None:
+            shape = (self.length, self.channels) if name != "output" else (self.length,)
+            if self.length == 0:
+                column = np.empty(shape, dtype=COLUMNS[name])
+            else:
+                column = np.memmap(os.path.join(self.path, name + ".bin"), dtype=COLUMNS[name],
+                                   mode="r", shape=shape)
+            self._columns[name] = column
+        return column
+
+    @property
+    def raw(self):
+        return self["raw"]
+
+    @property
+    def start_time(self):
+        return float(self.index["time"][0]) if len(self.index) else 0.0
+
+    @property
+    def end_time(self):
+        return float(self.times(self.length - 1, self.length)[0]) if self.length else 0.0
+
+    def times(self, start=0, stop=None):
+        """Time of each sample in [start, stop), from the index and the sample rate."""
+        stop = self.length if stop is None else stop
+        positions = np.arange(start, stop)
+        entry = np.searchsorted(self.index["position"], positions, side="right") - 1
+        return self.index["time"][entry] + (positions - self.index["position"][entry]) / self.sample_rate
+
+    def position(self, t):
+        """First sample at or after time t."""
+        if len(self.index) == 0:
+            return 0
+        entry = max(np.searchsorted(self.index["time"], t, side="right") - 1, 0)
+        first = int(self.index["position"][entry])
+        end = int(self.index["position"][entry + 1]) if entry + 1 < len(self.index) else self.length
+        offset = int(np.ceil((t - self.index["time"][entry]) * self.sample_rate))
+        return min(max(first + offset, 0), end)
+
+    def between(self, t0, t1):
+        """Memory-mapped columns for samples with t0 <= time < t1."""
+        start, stop = self.position(t0), self.position(t1)
+        return {name: self[name][start:stop] for name in COLUMNS}
+
+    def iter_blocks(self, block_size=ARCHIVE_BLOCK, start=0, stop=None, columns=tuple(COLUMNS)):
+        """Yield {column: array} blocks in order; memory use is one block."""
+        stop = self.length if stop is None else min(stop, self.length)
+        for begin in range(start, stop, block_size):
+            end = min(begin + block_size, stop)
+            yield {name: np.array(self[name][begin:end]) for name in columns}
+
+    def events(self):
+        """Gesture events as a structured array (sample counter, event code, action number)."""
+        return self._table("events", EVENT_DTYPE)
+
+    def _rows(self, name):
+        size = os.path.getsize(os.path.join(self.path, name + ".bin"))
+        width = np.dtype(COLUMNS[name]).itemsize * (1 if name == "output" else self.channels)
+        return size // width
+
+    def _table(self, name, dtype):
+        path = os.path.join(self.path, name + ".bin")
+        count = os.path.getsize(path) // dtype.itemsize
+        return np.fromfile(path, dtype=dtype, count=count)
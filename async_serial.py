@@ -0,0 +1,97 @@
+import asyncio
+import os
+import threading
+import time
+
+from serial_ingest import MAX_READ
+
+# ===============================
+# asyncio Serial Backend
+# ===============================
+# One event loop thread serves every board: each port's file descriptor is
+# registered with loop.add_reader, so there is no thread per port and no
+# read timeout to wait out. A session's stream is a task; stopping it is a
+# cancel, which takes effect immediately. Needs a selector event loop and a
+# port with a real file descriptor (Linux/macOS); use the threaded reader on
+# Windows.
+
+
+class AsyncSerialHub:
+    """Event loop thread that reads any number of serial ports into their pipelines."""
+
+    def __init__(self):
+        self.loop = None
+        self._thread = None
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self.loop = asyncio.SelectorEventLoop()
+                self._thread = threading.Thread(target=self.loop.run_forever, name="emg-async", daemon=True)
+                self._thread.start()
+
+    def close(self):
+        """Cancel every stream and stop the loop thread."""
+        with self._lock:
+            if self._thread is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._cancel_all(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self.loop.close()
+            self._thread = None
+
+    def run(self, coro):
+        """Run a coroutine on the hub's loop from any other thread and wait for it."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    # -------- Awaitable (on the hub's loop) --------
+
+    async def attach(self, port, reader, pipeline):
+        """
+        Start streaming `port` (an open pyserial port) through `reader` into
+        `pipeline`, which must have been started with read=False.
+        """
+        fd = port.fileno()
+        if port in self._tasks:
+            raise RuntimeError(f"{port.port} is already attached")
+        ready = asyncio.Event()
+        self.loop.add_reader(fd, ready.set)
+        self._tasks[port] = asyncio.ensure_future(self._stream(fd, ready, reader, pipeline))
+
+    async def detach(self, port):
+        """Stop streaming `port`; returns once the stream task has finished."""
+        task = self._tasks.pop(port, None)
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _cancel_all(self):
+        for port in list(self._tasks):
+            await self.detach(port)
+
+    async def _stream(self, fd, ready, reader, pipeline):
+        try:
+            while True:
+                await ready.wait()
+                ready.clear()
+                try:
+                    data = os.read(fd, MAX_READ)
+                except BlockingIOError:
+                    continue
+                except OSError as e:
+                    # EIO once the device is unplugged
+                    print("Serial read error:", e)
+                    break
+                if not data:
+                    # pyserial sets VMIN=0: an empty read just means no data yet
+                    continue
+                reader.arrival_ns = time.perf_counter_ns()
+                block = reader.feed(data)
+                if len(block):
+                    pipeline.feed(block, reader.arrival_ns)
+        finally:
+            self.loop.remove_reader(fd)
@@ -0,0 +1,395 @@
+"""
+Micro-benchmarks for the EMG processing path.
+
+Run with:  python benchmarks.py
+"""
+import sys
+import time
+from collections import Counter, deque
+
+import numpy as np
+
+from dsp import EMG_BANDPASS_SOS, SOSFilter
+from envelope import EnvelopeTracker
+from metrics import LatencyHistogram
+from replay import REPLAY_BLOCK, PseudoSerial, ReplaySource, synthetic_emg
+from serial_ingest import FrameDecoder, LineReader, encode_frames, encode_lines
+
+SAMPLE_RATE = 500           # Matches SAMPLE_RATE in Sketch.ino
+BUFFER_SIZE = 64
+
+
+def _synthetic_samples(n, channels=2, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(-300, 300, size=(n, channels))
+
+
+def _report(name, n, elapsed):
+    per_sample_us = elapsed / n * 1e6
+    budget = per_sample_us / (1e6 / SAMPLE_RATE) * 100
+    print(f"{name:<28} {n / elapsed:>12,.0f} samples/s  {per_sample_us:8.2f} us/sample  ({budget:.2f}% of {SAMPLE_RATE} Hz budget)")
+
+
+def bench_envelope(n=50_000):
+    """Old deque + np.mean path against EnvelopeTracker."""
+    samples = _synthetic_samples(n).tolist()
+
+    buffer1 = deque([0] * BUFFER_SIZE, maxlen=BUFFER_SIZE)
+    buffer2 = deque([0] * BUFFER_SIZE, maxlen=BUFFER_SIZE)
+    start = time.perf_counter()
+    for raw1, raw2 in samples:
+        buffer1.append(abs(raw1))
+        np.mean(buffer1) * 2
+        buffer2.append(abs(raw2))
+        np.mean(buffer2) * 2
+    _report("deque + np.mean", n, time.perf_counter() - start)
+
+    for mode in ("moving", "ema"):
+        tracker = EnvelopeTracker(channels=2, window=BUFFER_SIZE, mode=mode)
+        start = time.perf_counter()
+        for raw1, raw2 in samples:
+            tracker.update((abs(raw1), abs(raw2)))
+        _report(f"EnvelopeTracker.update {mode}", n, time.perf_counter() - start)
+
+    block = np.abs(np.array(samples))
+    tracker = EnvelopeTracker(channels=2, window=BUFFER_SIZE)
+    start = time.perf_counter()
+    for i in range(0, n, 256):
+        tracker.process_block(block[i:i + 256])
+    _report("EnvelopeTracker.block 256", n, time.perf_counter() - start)
+
+
+def bench_ingest(n=50_000, chunk=4096):
+    """readline()-style per-line parsing against LineReader.feed on raw chunks."""
+    samples = _synthetic_samples(n)
+    data = encode_lines(samples)
+
+    start = time.perf_counter()
+    for line in data.splitlines():
+        raw1, raw2 = map(int, line.decode("utf-8").strip().split("\t"))
+    _report("per-line decode + int()", n, time.perf_counter() - start)
+
+    reader = LineReader(channels=2, skip_partial=False)
+    start = time.perf_counter()
+    for i in range(0, len(data), chunk):
+        reader.feed(data[i:i + chunk])
+    _report(f"LineReader.feed {chunk} B", n, time.perf_counter() - start)
+
+    data = encode_frames(samples)
+    decoder = FrameDecoder(channels=2)
+    start = time.perf_counter()
+    for i in range(0, len(data), chunk):
+        decoder.feed(data[i:i + chunk])
+    _report(f"FrameDecoder.feed {chunk} B", n, time.perf_counter() - start)
+
+
+def bench_filter(n=50_000, block_size=REPLAY_BLOCK):
+    """Per-sample Python biquads (as in Sketch.ino) against the chunked SOSFilter."""
+    samples = _synthetic_samples(n).astype(np.float64) + 512
+    sos = EMG_BANDPASS_SOS
+    state = np.zeros((len(sos), 2, 2))
+    start = time.perf_counter()
+    for row in samples[:n // 10].tolist():
+        for ch, value in enumerate(row):
+            for s, (b0, b1, b2, _, a1, a2) in enumerate(sos.tolist()):
+                z1, z2 = state[s, ch]
+                out = b0 * value + z1
+                state[s, ch] = (b1 * value - a1 * out + z2, b2 * value - a2 * out)
+                value = out
+    _report("per-sample biquads", n // 10, time.perf_counter() - start)
+
+    bandpass = SOSFilter(sos, channels=2)
+    bandpass.process_block(samples[:block_size])
+    start = time.perf_counter()
+    for i in range(0, n, block_size):
+        bandpass.process_block(samples[i:i + block_size])
+    _report(f"SOSFilter.block {block_size}", n, time.perf_counter() - start)
+
+
+def bench_classifier(n=50_000):
+    """Threshold rules against windowed features + LDA / nearest centroid, 2 and 8 channels."""
+    from classifier import ThresholdClassifier, train_classifier
+
+    samples = synthetic_emg(n / SAMPLE_RATE)
+    env = EnvelopeTracker(channels=2, window=BUFFER_SIZE).process_block(np.abs(samples))
+    labels = ThresholdClassifier().classify(samples, env)
+    start = time.perf_counter()
+    for i in range(0, n, REPLAY_BLOCK):
+        ThresholdClassifier().classify(samples[i:i + REPLAY_BLOCK], env[i:i + REPLAY_BLOCK])
+    _report("threshold rules", n, time.perf_counter() - start)
+
+    for channels, gestures in ((2, 3), (8, 8)):
+        wide = np.tile(samples, (1, channels // 2))
+        wide_labels = labels if gestures == 3 else (labels + (np.arange(n) // 1000) * 4) % (gestures + 1)
+        for kind in ("lda", "centroid"):
+            model = train_classifier(wide, wide_labels, kind=kind, channels=channels)
+            start = time.perf_counter()
+            for i in range(0, n, REPLAY_BLOCK):
+                model.classify(wide[i:i + REPLAY_BLOCK], None)
+            _report(f"{kind} {channels}ch {gestures} gestures", n, time.perf_counter() - start)
+
+
+def bench_offload(n=200_000, channels=8, workers=2):
+    """
+    8-channel LDA in the DSP thread vs offloaded to worker processes, while a
+    reader-like thread sleeps 2 ms at a time and records how late it wakes up.
+    """
+    import threading
+
+    from classifier import ThresholdClassifier, train_classifier
+    from offload import RemoteClassifier
+
+    samples = np.tile(synthetic_emg(n / SAMPLE_RATE), (1, channels // 2))
+    env = EnvelopeTracker(channels=channels, window=BUFFER_SIZE).process_block(np.abs(samples))
+    labels = ThresholdClassifier().classify(samples, env)
+    for name in ("in-process", "offloaded"):
+        model = train_classifier(samples, labels, channels=channels)
+        if name == "offloaded":
+            model = RemoteClassifier(model, workers=workers)
+            model.start()
+        lateness = LatencyHistogram("reader")
+        done = threading.Event()
+
+        def reader():
+            while not done.is_set():
+                due = time.perf_counter_ns() + 2_000_000
+                time.sleep(0.002)
+                lateness.record(max(0, time.perf_counter_ns() - due))
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        latency = LatencyHistogram("classify")
+        start = time.perf_counter()
+        for i in range(0, n, REPLAY_BLOCK):
+            t0 = time.perf_counter_ns()
+            model.classify(samples[i:i + REPLAY_BLOCK], None)
+            latency.record(time.perf_counter_ns() - t0)
+        elapsed = time.perf_counter() - start
+        done.set()
+        thread.join()
+        _report(f"lda {channels}ch {name}", n, elapsed)
+        _print_latency("  classify per block", latency)
+        _print_latency("  reader wake-up lateness", lateness)
+        if name == "offloaded":
+            time.sleep(0.1)
+            model.classify(samples[:0], None)
+            stats = model.stats()
+            print(f"{'  backpressure':<28} sent {stats['sent']}, completed {stats['completed']}, "
+                  f"dropped {stats['dropped']}, ring high water {stats['ring_high_water']}")
+            _print_latency("  round trip", model.latency)
+            model.close()
+
+
+STARTUP_TARGET = 1.5       # Seconds from launch to first paint on the kiosk machines
+_IMPORT_PROBE = """
+import sys, time
+heavy = lambda: ",".join(m for m in ("numpy", "session", "keyboard") if m in sys.modules) or "none"
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+after_import = heavy()
+main.API().list_ports()
+print(imported - start, time.perf_counter() - imported, after_import, heavy())
+"""
+
+
+def bench_startup(runs=5):
+    """
+    Cold `import main` and the page's first list_ports() call in fresh
+    interpreters, and launch-to-first-paint of the window.
+    """
+    import subprocess
+
+    imports, listings = [], []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _IMPORT_PROBE], capture_output=True, text=True, check=True)
+        imported, listed, after_import, after_list = out.stdout.split()[-4:]
+        imports.append(float(imported))
+        listings.append(float(listed))
+    print(f"import main                  median {np.median(imports) * 1e3:8.1f} ms  min {min(imports) * 1e3:8.1f} ms"
+          f"  heavy modules loaded: {after_import}")
+    print(f"API.list_ports()             median {np.median(listings) * 1e3:8.1f} ms  min {min(listings) * 1e3:8.1f} ms"
+          f"  heavy modules loaded: {after_list}")
+
+    launched = time.time()
+    try:
+        out = subprocess.run([sys.executable, __file__, "--paint-probe"], capture_output=True, text=True, timeout=60)
+        painted = float(out.stdout.split()[-1])
+    except (subprocess.TimeoutExpired, ValueError, IndexError):
+        print("first paint                  skipped (no display / webview backend)")
+        return
+    first_paint = painted - launched
+    verdict = "OK" if first_paint <= STARTUP_TARGET else "OVER"
+    print(f"first paint                  {first_paint * 1e3:8.1f} ms  (target {STARTUP_TARGET * 1e3:.0f} ms: {verdict})")
+
+
+def _paint_probe():
+    """Open the real window, print the wall-clock time of its first paint and exit."""
+    import main
+
+    window = main.webview.create_window("EMG Gesture Control", html=main.html_content, js_api=main.API())
+
+    def probe():
+        window.events.loaded.wait()
+        for _ in range(100):
+            painted = window.evaluate_js(
+                "(() => { const p = performance.getEntriesByType('paint');"
+                " return p.length ? performance.timeOrigin + p[0].startTime : 0; })()")
+            if painted:
+                break
+            time.sleep(0.01)
+        print(painted / 1000)
+        window.destroy()
+
+    main.webview.start(probe)
+
+
+def _print_latency(name, histogram, scale=1):
+    snap = histogram.snapshot()
+    print(f"{name:<28} p50 {snap['p50_us'] / scale:8.2f} us  p95 {snap['p95_us'] / scale:8.2f} us  "
+          f"p99 {snap['p99_us'] / scale:8.2f} us  max {snap['max_us'] / scale:8.2f} us")
+
+
+def bench_replay(seconds=120.0, block_size=REPLAY_BLOCK):
+    """Synthetic EMG through Session.process_block, faster than real time."""
+    import main
+
+    samples = synthetic_emg(seconds)
+    main.RECORD_SESSIONS = False
+    session = main.new_session("replay")
+    source = ReplaySource(samples, block_size=block_size)
+    latency = LatencyHistogram("block")
+    actions = Counter()
+    start = time.perf_counter()
+    for block in source:
+        clock = source.position / SAMPLE_RATE
+        t0 = time.perf_counter_ns()
+        triggered, _ = session.process_block(block, clock)
+        latency.record(time.perf_counter_ns() - t0)
+        actions.update(f"{action} {event}" for event, action, _ in triggered)
+    elapsed = time.perf_counter() - start
+    _report(f"replay process_block {block_size}", len(samples), elapsed)
+    print(f"{'':<28} {seconds / elapsed:,.0f}x real time")
+    _print_latency("  block latency", latency)
+    _print_latency("  per-sample latency", latency, scale=block_size)
+    print(f"{'  decisions':<28} " + ", ".join(f"{name}: {count}" for name, count in sorted(actions.items())))
+
+
+def bench_drift(seconds=300.0, offset=30.0, gain=0.6, block_size=REPLAY_BLOCK):
+    """
+    Replay with the electrode baseline rising by `offset` and the gain falling
+    to `gain` over the run, with and without adaptive normalization.
+    """
+    import main
+
+    samples = synthetic_emg(seconds)
+    ramp = np.linspace(0.0, 1.0, len(samples))[:, None]
+    drifted = np.rint(samples * (1.0 + (gain - 1.0) * ramp) + offset * ramp).astype(np.int64)
+    main.RECORD_SESSIONS = False
+    configured = main.NORMALIZE
+    runs = [("no drift", samples, False), ("drift", drifted, False), ("drift normalized", drifted, True)]
+    for label, signal, normalize in runs:
+        main.NORMALIZE = normalize
+        session = main.new_session("drift")
+        source = ReplaySource(signal, block_size=block_size)
+        late = Counter()    # Taps in the last third, where the drift is largest
+        for block in source:
+            clock = source.position / SAMPLE_RATE
+            triggered, _ = session.process_block(block, clock)
+            if clock > seconds * 2 / 3:
+                late.update(action for _, action, _ in triggered)
+        print(f"{label:<28} last third: " + ", ".join(f"{name}: {late[name]}" for name in sorted(session.action_keys)))
+    main.NORMALIZE = configured
+
+
+def bench_actuator(n=100_000, per_block=4):
+    """
+    Pipeline actuator stage and Dispatcher throughput into the memory backend
+    and into a local UDP socket; no input device needed.
+    """
+    import socket
+
+    from actuators import Dispatcher, MemoryActuator, UDPActuator
+    from pipeline import BLOCK, Pipeline
+
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 22)
+    keys = {f"action{k}": key for k, key in enumerate(("space", "left", "right", "up"), 1)}
+    # Taps spaced beyond the rate limit, so every event goes out
+    events = [("tap", f"action{i % len(keys) + 1}", i * 0.1) for i in range(n)]
+    blocks = [events[i:i + per_block] for i in range(0, n, per_block)]
+    for backend in (MemoryActuator(), UDPActuator(receiver.getsockname())):
+        dispatcher = Dispatcher(backend)
+
+        def actuate(actions):
+            dispatcher.dispatch([(event, keys[action], action, t) for event, action, t in actions])
+
+        # Flooded for throughput, then one block per millisecond for latency
+        for pace in (0.0, 0.001):
+            dispatcher.reset()
+            pipeline = Pipeline(None, lambda block: (block, None), actuate, maxsize=n, policy=BLOCK)
+            pipeline.start(read=False)
+            start = time.perf_counter()
+            for block in blocks if not pace else blocks[:2000]:
+                pipeline.feed(block, time.perf_counter_ns())
+                if pace:
+                    time.sleep(pace)
+            pipeline.stop(timeout=60)
+            elapsed = time.perf_counter() - start
+            stats = dispatcher.stats()
+            if not pace:
+                print(f"{'actuator ' + stats['backend']:<28} {stats['sent'] / elapsed:>12,.0f} events/s  "
+                      f"{stats['batches']} batches (largest {stats['largest_batch']}), {stats['dropped']} dropped")
+            else:
+                _print_latency("  classified to sent (1 kHz)", pipeline.metrics.actuate)
+        dispatcher.close()
+    receiver.close()
+
+
+def bench_pty(seconds=5.0):
+    """Whole API.start_emg path against a pseudo-serial board (Linux/macOS)."""
+    import main
+
+    board = PseudoSerial(synthetic_emg(seconds + 5), serial_format=main.SERIAL_FORMAT)
+    main.SERIAL_PORT = board.start()
+    main.RECORD_SESSIONS = False
+    main.ACTUATOR = "memory"
+    api = main.API()
+    try:
+        print(api.start_emg("space", "left", "right"))
+        pressed = main.manager.get(main.SERIAL_PORT).actuator.backend.events
+        time.sleep(seconds)
+        result = api.get_metrics()
+        print(api.stop_emg())
+    finally:
+        board.stop()
+    print(f"pty pipeline                 {result['samples'] / result['uptime_s']:,.0f} samples/s over "
+          f"{result['uptime_s']} s, {len(pressed)} key presses, "
+          f"{result['malformed_lines']} malformed, {result['dropped_frames']} dropped")
+    for stage in ("parse", "queue", "envelope", "classify", "end_to_end"):
+        snap = result["latency"][stage]
+        print(f"  {stage:<26} p50 {snap['p50_us']:8.2f} us  p99 {snap['p99_us']:8.2f} us  max {snap['max_us']:8.2f} us")
+
+
+BENCHMARKS = {
+    "envelope": bench_envelope,
+    "ingest": bench_ingest,
+    "filter": bench_filter,
+    "classifier": bench_classifier,
+    "offload": bench_offload,
+    "replay": bench_replay,
+    "drift": bench_drift,
+    "actuator": bench_actuator,
+    "pty": bench_pty,
+    "startup": bench_startup,
+}
+
+
+if __name__ == "__main__":
+    # python benchmarks.py [name ...]  (default: all)
+    if sys.argv[1:] == ["--paint-probe"]:
+        _paint_probe()
+        sys.exit()
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
@@ -0,0 +1,109 @@
+import time
+
+import numpy as np
+
+# ===============================
+# Calibration & Baseline
+# ===============================
+# Record a rest period and a contraction on each channel while EMG is
+# running, keep streaming statistics for each, and derive the thresholds
+# used by ThresholdClassifier from them.
+
+PHASES = ("rest", "ch1", "ch2")     # Relax, contract channel 1, contract channel 2
+NOISE_SIGMAS = 3.0                  # Thresholds stay this many std devs above rest
+ONSET_FRACTION = 0.4                # ... and this far from rest towards contraction
+
+
+class RunningStats:
+    """Per-channel count/mean/variance with Welford's update, merged a block at a time."""
+
+    def __init__(self, channels=2):
+        self.count = 0
+        self.mean = np.zeros(channels)
+        self._m2 = np.zeros(channels)
+
+    def update(self, block):
+        block = np.asarray(block, dtype=np.float64)
+        n = len(block)
+        if n == 0:
+            return
+        block_mean = block.mean(axis=0)
+        block_m2 = ((block - block_mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = block_mean - self.mean
+        self.mean = self.mean + delta * n / total
+        self._m2 = self._m2 + block_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    @property
+    def std(self):
+        return np.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else np.zeros_like(self.mean)
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean.tolist(), "std": self.std.tolist()}
+
+
+class Calibrator:
+    """Collects raw/envelope statistics for whichever phase is active."""
+
+    def __init__(self, channels=2):
+        self.channels = channels
+        self.phase = None
+        self.reset()
+
+    def reset(self):
+        self.phase = None
+        self.raw = {phase: RunningStats(self.channels) for phase in PHASES}
+        self.env = {phase: RunningStats(self.channels) for phase in PHASES}
+
+    def start(self, phase):
+        if phase not in PHASES:
+            raise ValueError(f"Unknown calibration phase: {phase}")
+        self.phase = phase
+
+    def stop(self):
+        self.phase = None
+
+    def update(self, raw, env):
+        """Called from the DSP stage with every block."""
+        phase = self.phase
+        if phase is not None:
+            self.raw[phase].update(raw)
+            self.env[phase].update(env)
+
+    def progress(self):
+        return {"phase": self.phase, "samples": {phase: self.raw[phase].count for phase in PHASES}}
+
+    def profile(self, name):
+        """Build a profile with per-phase statistics and derived thresholds."""
+        missing = [phase for phase in PHASES if self.raw[phase].count < 2]
+        if missing:
+            raise ValueError(f"Calibration incomplete: no data for {', '.join(missing)}")
+        return {
+            "name": name,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
+            "stats": {
+                phase: {"raw": self.raw[phase].to_dict(), "env": self.env[phase].to_dict()}
+                for phase in PHASES
+            },
+            "thresholds": derive_thresholds(self.raw, self.env),
+        }
+
+
+def _onset(rest, active, channel):
+    """Threshold between rest and contraction on one channel."""
+    floor = rest.mean[channel] + NOISE_SIGMAS * rest.std[channel]
+    level = rest.mean[channel] + ONSET_FRACTION * (active.mean[channel] - rest.mean[channel])
+    return float(max(floor, level))
+
+
+def derive_thresholds(raw, env):
+    """Map calibration statistics onto ThresholdClassifier's parameters."""
+    env2_on = _onset(env["rest"], env["ch2"], 1)
+    return {
+        "raw1_on": _onset(raw["rest"], raw["ch1"], 0),
+        "env2_on": env2_on,
+        # Original rules keep channel 2 "quiet" below half its onset
+        "env2_quiet": env2_on / 2,
+        "env1_split": float(env["rest"].mean[0] + NOISE_SIGMAS * env["rest"].std[0]),
+    }
@@ -0,0 +1,283 @@
+import json
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# ===============================
+# Gesture Classifiers
+# ===============================
+# Every classifier maps a block of samples to one action number per sample
+# (0 = no action), so Session.process_block does not care which one is active.
+# `input` says what a classifier's first argument is: the board envelope, or
+# the band-passed signal when HOST_FILTER gives the host one.
+
+FEATURES = ("rms", "mav", "wl", "zc", "ssc")
+# Zero crossings never happen on a non-negative envelope and slope sign
+# changes only count its ripple, so a model over envelopes (the board's
+# output unless HOST_FILTER is on) uses the amplitude features only
+ENVELOPE_FEATURES = ("rms", "mav", "wl")
+FEATURE_WINDOW = 64         # Samples per feature window
+FEATURE_STEP = 16           # New decision every FEATURE_STEP samples
+
+
+class ThresholdClassifier:
+    """The original hand-tuned rules over the board envelope and its smoothed envelope."""
+
+    input = "envelope"
+
+    def __init__(self, raw1_on=20, env2_quiet=50, env2_on=100, env1_split=10):
+        self.raw1_on = raw1_on
+        self.env2_quiet = env2_quiet
+        self.env2_on = env2_on
+        self.env1_split = env1_split
+
+    def reset(self):
+        pass
+
+    def classify(self, raw, env):
+        raw1 = raw[:, 0]
+        envelope1, envelope2 = env[:, 0], env[:, 1]
+        action1 = (raw1 > self.raw1_on) & (envelope2 < self.env2_quiet)
+        strong2 = ~action1 & (envelope2 > self.env2_on)
+        action3 = strong2 & (envelope1 > self.env1_split)
+        action2 = strong2 & (envelope1 < self.env1_split)
+        return np.select([action1, action2, action3], [1, 2, 3], 0)
+
+
+class FeatureExtractor:
+    """
+    Standard time-domain EMG features over sliding windows, for every channel
+    at once. Windows end every `step` samples and may span block boundaries.
+    """
+
+    def __init__(self, channels=2, window=FEATURE_WINDOW, step=FEATURE_STEP, features=FEATURES, threshold=0.0):
+        unknown = set(features) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown features: {sorted(unknown)}")
+        self.channels = channels
+        self.window = window
+        self.step = step
+        self.features = tuple(features)
+        self.threshold = threshold
+        self.reset()
+
+    @property
+    def size(self):
+        return len(self.features) * self.channels
+
+    def reset(self):
+        # Two extra samples of context for the first window's differences
+        self._history = np.zeros((self.window + 2, self.channels))
+        self._count = 0
+
+    def process_block(self, block):
+        """
+        Returns (features, ends): an (M, size) array, one row per window that
+        ended in this block, and the index in the block where each window ended.
+        """
+        block = np.asarray(block, dtype=np.float64).reshape(-1, self.channels)
+        # Windows end at global sample indices window-1, window-1+step, ...
+        first = max(self._count, self.window - 1)
+        first += -(first - self.window + 1) % self.step
+        ends = np.arange(first, self._count + len(block), self.step) - self._count
+        self._count += len(block)
+        extended = np.concatenate((self._history, block))
+        self._history = extended[-(self.window + 2):]
+        if len(ends) == 0:
+            return np.empty((0, self.size)), ends
+        return self.compute(extended, ends + self.window), ends
+
+    def compute(self, signal, last):
+        """
+        Feature rows for the windows whose last sample is signal[2 + last]
+        (rows: samples, columns: channels; the first two rows are context only).
+        """
+        x = signal[2:]
+        diff = np.diff(signal, axis=0)
+        step, prev_step = diff[1:], diff[:-1]
+        columns = {
+            "mav": lambda: np.abs(x),
+            "rms": lambda: x * x,
+            "wl": lambda: np.abs(step),
+            "zc": lambda: ((signal[1:-1] * x < 0) & (np.abs(step) >= self.threshold)).astype(np.float64),
+            # Counted one sample late so every window only needs past samples
+            "ssc": lambda: (prev_step * -step > self.threshold).astype(np.float64),
+        }
+        # (samples, channels, features) -> windows over the sample axis
+        primitives = np.stack([columns[name]() for name in self.features], axis=-1)
+        windows = sliding_window_view(primitives, self.window, axis=0)[last - self.window + 1]
+        sums = windows.sum(axis=-1)
+        if "mav" in self.features:
+            sums[..., self.features.index("mav")] /= self.window
+        if "rms" in self.features:
+            i = self.features.index("rms")
+            sums[..., i] = np.sqrt(sums[..., i] / self.window)
+        return sums.reshape(len(last), -1)
+
+
+class NearestCentroid:
+    """Standardized nearest-centroid model."""
+
+    kind = "centroid"
+
+    def fit(self, X, y):
+        self.labels = np.unique(y)
+        self.mean = X.mean(axis=0)
+        self.scale = X.std(axis=0) + 1e-9
+        Z = (X - self.mean) / self.scale
+        self.centroids = np.stack([Z[y == label].mean(axis=0) for label in self.labels])
+        return self
+
+    def predict(self, X):
+        Z = (X - self.mean) / self.scale
+        # |z - c|^2 without the |z|^2 term, which is the same for every class
+        scores = Z @ self.centroids.T * 2 - (self.centroids ** 2).sum(axis=1)
+        return self.labels[np.argmax(scores, axis=1)]
+
+    def to_dict(self):
+        return {"kind": self.kind, "labels": self.labels.tolist(), "mean": self.mean.tolist(),
+                "scale": self.scale.tolist(), "centroids": self.centroids.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        model = cls()
+        model.labels = np.array(data["labels"])
+        model.mean = np.array(data["mean"])
+        model.scale = np.array(data["scale"])
+        model.centroids = np.array(data["centroids"])
+        return model
+
+
+class LDA:
+    """Linear discriminant analysis with a shrunk pooled covariance."""
+
+    kind = "lda"
+
+    def __init__(self, shrinkage=0.1):
+        self.shrinkage = shrinkage
+
+    def fit(self, X, y):
+        self.labels = np.unique(y)
+        self.mean = X.mean(axis=0)
+        self.scale = X.std(axis=0) + 1e-9
+        Z = (X - self.mean) / self.scale
+        means = np.stack([Z[y == label].mean(axis=0) for label in self.labels])
+        centered = Z - means[np.searchsorted(self.labels, y)]
+        cov = centered.T @ centered / max(len(Z) - len(self.labels), 1)
+        cov = (1 - self.shrinkage) * cov + self.shrinkage * np.eye(len(cov)) * np.trace(cov) / len(cov)
+        priors = np.array([np.mean(y == label) for label in self.labels])
+        self.coef = np.linalg.solve(cov, means.T)
+        self.intercept = -0.5 * np.sum(means.T * self.coef, axis=0) + np.log(priors)
+        return self
+
+    def predict(self, X):
+        scores = ((X - self.mean) / self.scale) @ self.coef + self.intercept
+        return self.labels[np.argmax(scores, axis=1)]
+
+    def to_dict(self):
+        return {"kind": self.kind, "labels": self.labels.tolist(), "mean": self.mean.tolist(),
+                "scale": self.scale.tolist(), "coef": self.coef.tolist(), "intercept": self.intercept.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        model = cls()
+        model.labels = np.array(data["labels"])
+        model.mean = np.array(data["mean"])
+        model.scale = np.array(data["scale"])
+        model.coef = np.array(data["coef"])
+        model.intercept = np.array(data["intercept"])
+        return model
+
+
+MODELS = {NearestCentroid.kind: NearestCentroid, LDA.kind: LDA}
+
+
+class ModelClassifier:
+    """
+    Feature windows + a trained model; decisions hold until the next window.
+    Classifies the band-passed signal when there is one (see train_from_blocks).
+    """
+
+    input = "signal"
+
+    def __init__(self, model, extractor):
+        self.model = model
+        self.extractor = extractor
+        self._last = 0
+
+    def reset(self):
+        self.extractor.reset()
+        self._last = 0
+
+    def classify(self, raw, env):
+        features, ends = self.extractor.process_block(raw)
+        outputs = np.full(len(raw), self._last, dtype=np.int64)
+        if len(ends):
+            decisions = self.model.predict(features).astype(np.int64)
+            # Each decision applies from its window end until the next one
+            marks = np.zeros(len(raw), dtype=np.int64)
+            marks[ends] = np.arange(1, len(ends) + 1)
+            held = np.maximum.accumulate(marks)
+            outputs = np.where(held > 0, decisions[held - 1], self._last)
+            self._last = int(decisions[-1])
+        return outputs
+
+    def to_dict(self):
+        e = self.extractor
+        return {"model": self.model.to_dict(), "channels": e.channels, "window": e.window,
+                "step": e.step, "features": list(e.features), "threshold": e.threshold}
+
+    @classmethod
+    def from_dict(cls, data):
+        model = MODELS[data["model"]["kind"]].from_dict(data["model"])
+        extractor = FeatureExtractor(data["channels"], data["window"], data["step"],
+                                     data["features"], data["threshold"])
+        return cls(model, extractor)
+
+
+def train_classifier(samples, labels, kind="lda", channels=2, window=FEATURE_WINDOW, step=FEATURE_STEP,
+                     features=None, bandpass=None):
+    """
+    Fit a ModelClassifier on an (N, channels) recording with one label per
+    sample (0 = rest, k = action k). Each window takes the label of its last sample.
+    """
+    return train_from_blocks([(samples, labels)], kind, channels, window, step, features, bandpass)
+
+
+def train_from_blocks(blocks, kind="lda", channels=2, window=FEATURE_WINDOW, step=FEATURE_STEP,
+                      features=None, bandpass=None):
+    """
+    Same as train_classifier for a recording too big for memory: `blocks`
+    yields consecutive (samples, labels) pieces, e.g. from
+    Archive.iter_blocks(). Only the feature rows are kept.
+
+    For raw ADC recorded with HOST_FILTER, pass the session's band-pass
+    (dsp.SOSFilter) so the model sees the same signal it will classify live;
+    features then default to all of FEATURES. Without it the samples are
+    board envelopes and features default to ENVELOPE_FEATURES.
+    """
+    if features is None:
+        features = FEATURES if bandpass else ENVELOPE_FEATURES
+    extractor = FeatureExtractor(channels, window, step, features)
+    rows, targets = [], []
+    for samples, labels in blocks:
+        if bandpass:
+            samples = bandpass.process_block(samples)
+        block_rows, ends = extractor.process_block(samples)
+        rows.append(block_rows)
+        targets.append(np.asarray(labels)[ends])
+    model = MODELS[kind]().fit(np.concatenate(rows), np.concatenate(targets))
+    extractor.reset()
+    if bandpass:
+        bandpass.reset()
+    return ModelClassifier(model, extractor)
+
+
+def save_classifier(classifier, path):
+    with open(path, "w") as f:
+        json.dump(classifier.to_dict(), f)
+
+
+def load_classifier(path):
+    with open(path) as f:
+        return ModelClassifier.from_dict(json.load(f))
@@ -0,0 +1,157 @@
+import numpy as np
+
+# ===============================
+# Host-side IIR Filtering
+# ===============================
+# Butterworth design and streaming second-order-section (SOS) filtering in
+# plain NumPy, so the board can send raw ADC readings and the band can be
+# changed without reflashing.
+#
+# A cascade of biquads is linear and time-invariant, so for a chunk of L
+# samples the output is  y = T @ x + O @ s  and the new state is
+# s' = A @ s + C @ x,  where T, O, A and C only depend on the coefficients and
+# L. Precomputing them turns the per-sample recursion into a few small
+# matrix products per chunk, for every channel at once.
+
+FILTER_CHUNK = 64           # Samples per precomputed chunk
+
+# Sketch.ino's EMGFilter: 4th order band-pass, 74.5-149.5 Hz at 500 Hz.
+# Rows are [b0, b1, b2, a0, a1, a2].
+EMG_BANDPASS_SOS = np.array([
+    [0.01856301, 0.03712602, 0.01856301, 1.0, 0.05159732, 0.36347401],
+    [1.0, -2.0, 1.0, 1.0, -0.53945795, 0.39764934],
+    [1.0, 2.0, 1.0, 1.0, 0.47319594, 0.70744137],
+    [1.0, -2.0, 1.0, 1.0, -1.00211112, 0.74520226],
+])
+
+
+def butter_sos(order, cutoff, fs, btype="bandpass"):
+    """
+    Digital Butterworth filter as second-order sections.
+    cutoff is a frequency in Hz, or a (low, high) pair for "bandpass".
+    Same response as scipy.signal.butter(order, cutoff, btype, fs=fs, output="sos").
+    """
+    # Analog prototype poles on the left half of the unit circle
+    k = np.arange(order)
+    poles = np.exp(1j * np.pi * (2 * k + order + 1) / (2 * order))
+    fs2 = 2.0 * fs
+
+    def warp(f):
+        return fs2 * np.tan(np.pi * f / fs)
+
+    if btype == "lowpass":
+        wo = warp(cutoff)
+        poles = poles * wo
+        zeros = np.array([])
+        gain = wo ** order
+    elif btype == "highpass":
+        wo = warp(cutoff)
+        poles = wo / poles
+        zeros = np.zeros(order)
+        gain = 1.0              # Butterworth poles multiply to 1
+    elif btype == "bandpass":
+        low, high = warp(cutoff[0]), warp(cutoff[1])
+        bw, wo = high - low, np.sqrt(low * high)
+        scaled = poles * bw / 2
+        poles = np.concatenate((scaled + np.sqrt(scaled ** 2 - wo ** 2 + 0j),
+                                scaled - np.sqrt(scaled ** 2 - wo ** 2 + 0j)))
+        zeros = np.zeros(order)
+        gain = bw ** order
+    else:
+        raise ValueError(f"Unknown filter type: {btype}")
+
+    # Bilinear transform; zeros at infinity land on z = -1
+    gain = gain * np.real(np.prod(fs2 - zeros) / np.prod(fs2 - poles))
+    zeros = np.concatenate(((fs2 + zeros) / (fs2 - zeros), -np.ones(len(poles) - len(zeros))))
+    poles = (fs2 + poles) / (fs2 - poles)
+    return _zpk_to_sos(zeros, poles, gain)
+
+
+def _zpk_to_sos(zeros, poles, gain):
+    """Pair conjugate poles (closest to the unit circle last) with zeros into biquads."""
+    upper = poles[np.imag(poles) > 1e-12]
+    real = np.sort(np.real(poles[np.abs(np.imag(poles)) <= 1e-12]))
+    sections = [[p, np.conj(p)] for p in upper]
+    sections += [list(real[i:i + 2]) for i in range(0, len(real), 2)]
+    sections.sort(key=lambda pair: np.max(np.abs(pair)))
+
+    # Zeros are all real here (-1 and/or +1); hand them out in order
+    zeros = list(np.sort(np.real(zeros)))
+    sos = np.zeros((len(sections), 6))
+    for i, pair in enumerate(sections):
+        section_zeros, zeros = zeros[:len(pair)], zeros[len(pair):]
+        b = np.real(np.poly(section_zeros))
+        a = np.real(np.poly(pair))
+        sos[i, :3] = np.pad(b, (0, 3 - len(b)))
+        sos[i, 3:] = np.pad(a, (0, 3 - len(a)))
+    sos[0, :3] *= gain
+    return sos
+
+
+class SOSFilter:
+    """Streaming SOS filter for (N, channels) blocks; state carries across calls."""
+
+    def __init__(self, sos, channels=2, chunk=FILTER_CHUNK):
+        self.sos = np.asarray(sos, dtype=np.float64).reshape(-1, 6)
+        self.sos = self.sos / self.sos[:, 3:4]
+        self.channels = channels
+        self.chunk = chunk
+        self.order = 2 * len(self.sos)
+        self._matrices = {}
+        self.reset()
+
+    def reset(self):
+        """Zero the filter state."""
+        self.state = np.zeros((self.order, self.channels))
+
+    def process_block(self, block):
+        """Filter an (N, channels) block and return the float64 output."""
+        x = np.asarray(block, dtype=np.float64).reshape(-1, self.channels)
+        out = np.empty_like(x)
+        for start in range(0, len(x), self.chunk):
+            part = x[start:start + self.chunk]
+            T, O, A, C = self._chunk_matrices(len(part))
+            out[start:start + len(part)] = T @ part + O @ self.state
+            self.state = A @ self.state + C @ part
+        return out
+
+    def _chunk_matrices(self, length):
+        matrices = self._matrices.get(length)
+        if matrices is None:
+            matrices = self._matrices[length] = self._build(length)
+        return matrices
+
+    def _build(self, length):
+        eye = np.eye(self.order)
+        # Impulse response and the state it leaves behind after m samples
+        impulse = np.zeros(length)
+        impulse[0] = 1.0
+        h, states = self._run(impulse, np.zeros(self.order))
+        T = np.zeros((length, length))
+        for j in range(length):
+            T[j:, j] = h[:length - j]
+        C = np.stack([states[length - 1 - j] for j in range(length)], axis=1)
+        # Zero-input response from each unit state
+        O = np.empty((length, self.order))
+        A = np.empty((self.order, self.order))
+        for k in range(self.order):
+            y, trajectory = self._run(np.zeros(length), eye[k])
+            O[:, k] = y
+            A[:, k] = trajectory[-1]
+        return T, O, A, C
+
+    def _run(self, x, state):
+        """Reference per-sample transposed direct form II for one channel."""
+        state = state.copy()
+        y = np.empty(len(x))
+        states = np.empty((len(x), self.order))
+        for n, value in enumerate(x):
+            for s, (b0, b1, b2, _, a1, a2) in enumerate(self.sos):
+                z1, z2 = state[2 * s], state[2 * s + 1]
+                out = b0 * value + z1
+                state[2 * s] = b1 * value - a1 * out + z2
+                state[2 * s + 1] = b2 * value - a2 * out
+                value = out
+            y[n] = value
+            states[n] = state
+        return y, states
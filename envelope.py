@@ -0,0 +1,87 @@
+import numpy as np
+
+# ===============================
+# Envelope Engine
+# ===============================
+# Same idea as getEnvelope1/getEnvelope2 in Sketch.ino: keep a circular
+# buffer and a running sum so every new sample costs O(1), no matter how
+# long the smoothing window is.
+
+ENVELOPE_GAIN = 2.0
+
+
+class EnvelopeTracker:
+    """Running-sum (or EMA) envelope for one or more EMG channels."""
+
+    def __init__(self, channels=2, window=64, mode="moving", alpha=None, gain=ENVELOPE_GAIN):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        if mode not in ("moving", "ema"):
+            raise ValueError("mode must be 'moving' or 'ema'")
+        self.channels = channels
+        self.window = window
+        self.mode = mode
+        self.gain = gain
+        # Default EMA weight gives roughly the same smoothing as the window
+        self.alpha = alpha if alpha is not None else 2.0 / (window + 1)
+        self.reset()
+
+    def reset(self):
+        """Clear the window and running sums."""
+        self._ring = [[0] * self.window for _ in range(self.channels)]
+        self._sum = [0] * self.channels
+        self._ema = [0.0] * self.channels
+        self._index = 0
+
+    def update(self, values):
+        """Push one sample per channel and return the list of envelopes."""
+        if self.mode == "ema":
+            alpha = self.alpha
+            ema = self._ema
+            for ch in range(self.channels):
+                ema[ch] += alpha * (values[ch] - ema[ch])
+            return [e * self.gain for e in ema]
+
+        idx = self._index
+        ring = self._ring
+        total = self._sum
+        for ch in range(self.channels):
+            value = values[ch]
+            total[ch] += value - ring[ch][idx]
+            ring[ch][idx] = value
+        self._index = (idx + 1) % self.window
+        scale = self.gain / self.window
+        return [s * scale for s in total]
+
+    def process_block(self, block):
+        """
+        Feed an (N, channels) block of rectified samples.
+        Returns an (N, channels) float array of envelopes.
+        """
+        block = np.asarray(block, dtype=np.float64).reshape(-1, self.channels)
+        n = block.shape[0]
+        if n == 0:
+            return np.empty((0, self.channels))
+
+        if self.mode == "ema":
+            out = np.empty_like(block)
+            ema = np.array(self._ema, dtype=np.float64)
+            alpha = self.alpha
+            for i in range(n):
+                ema += alpha * (block[i] - ema)
+                out[i] = ema
+            self._ema = ema.tolist()
+            return out * self.gain
+
+        # Oldest-to-newest history followed by the new block; the window sum
+        # ending at each new sample is then a difference of two cumsums.
+        history = np.roll(np.array(self._ring, dtype=np.float64).T, -self._index, axis=0)
+        extended = np.concatenate((history, block))
+        csum = np.concatenate((np.zeros((1, self.channels)), np.cumsum(extended, axis=0)))
+        sums = csum[self.window + 1:] - csum[1:n + 1]
+
+        tail = extended[-self.window:]
+        self._ring = tail.T.tolist()
+        self._sum = tail.sum(axis=0).tolist()
+        self._index = 0
+        return sums * (self.gain / self.window)
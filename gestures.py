@@ -0,0 +1,136 @@
+import numpy as np
+
+# ===============================
+# Gesture State Machine
+# ===============================
+# Turns the classifier's per-sample decisions into key events, separately
+# for every action:
+#   - onset hysteresis: the decision must hold for `onset` seconds
+#   - offset hysteresis: the gesture ends after `offset` seconds without it
+#   - refractory: no new onset for `refractory` seconds after it ends
+#   - "tap" sends one press-and-release per gesture, "hold" keeps the key
+#     down from onset to offset
+# Timing settings live in one table with a row per action. Blocks are
+# walked a run of equal decisions at a time, and only the action in the run
+# plus the few actions already pending or active are touched, so the cost
+# does not grow with the number of configured actions.
+
+TAP = "tap"
+HOLD = "hold"
+
+DEFAULT_GESTURE = {"mode": TAP, "onset": 0.0, "offset": 0.05, "refractory": 0.5}
+
+
+class GestureStateMachine:
+    """Per-action onset/offset/refractory tracking; emits (event, action, sample index)."""
+
+    def __init__(self, gestures=None, sample_rate=500, actions=3):
+        if gestures is None:
+            gestures = {f"action{n}": DEFAULT_GESTURE for n in range(1, actions + 1)}
+        self.sample_rate = sample_rate
+        size = 1 + max(int(name[len("action"):]) for name in gestures)
+        # Row n configures decision n (row 0 = no action, never used)
+        self.names = [None] * size
+        self.hold = np.zeros(size, dtype=bool)
+        self.onset = np.ones(size, dtype=np.int64)
+        self.offset = np.ones(size, dtype=np.int64)
+        self.refractory = np.zeros(size, dtype=np.int64)
+        for name, settings in gestures.items():
+            n = int(name[len("action"):])
+            settings = {**DEFAULT_GESTURE, **settings}
+            if settings["mode"] not in (TAP, HOLD):
+                raise ValueError(f"Unknown gesture mode for {name}: {settings['mode']}")
+            self.names[n] = name
+            self.hold[n] = settings["mode"] == HOLD
+            # At least one sample each way, so a lone decision still counts
+            self.onset[n] = max(1, round(settings["onset"] * sample_rate))
+            self.offset[n] = max(1, round(settings["offset"] * sample_rate))
+            self.refractory[n] = round(settings["refractory"] * sample_rate)
+        self.reset()
+
+    def reset(self):
+        size = len(self.names)
+        self.active = np.zeros(size, dtype=bool)
+        self.count = np.zeros(size, dtype=np.int64)     # Onset samples so far, or offset samples if active
+        self.ready_at = np.zeros(size, dtype=np.int64)  # First sample after the refractory window
+        self._busy = set()                              # Actions that are pending or active
+        self.position = 0                               # Samples seen before the current block
+
+    def process_block(self, outputs, enabled=True):
+        """
+        Feed the next block of decisions. All timing is counted in samples,
+        so the events do not depend on how decisions are split into blocks.
+        With enabled=False every decision counts as "no action", so held keys
+        are released but nothing new starts (e.g. while calibrating).
+        Returns [(event, action, index)] in sample order, event being
+        "tap", "press" or "release" and index the sample in the block.
+        """
+        n = len(outputs)
+        if n == 0:
+            return []
+        if enabled:
+            outputs = np.where(outputs < len(self.names), outputs, 0)
+            bounds = np.flatnonzero(np.diff(outputs)) + 1
+            starts = [0] + bounds.tolist()
+            values = outputs[starts].tolist()
+        else:
+            starts, values = [0], [0]
+        ends = starts[1:] + [n]
+        events = []
+        for value, start, end in zip(values, starts, ends):
+            if value and self.names[value] is None:
+                value = 0
+            for action in list(self._busy):
+                if action != value:
+                    self._absent(action, start, end, events)
+            if value:
+                self._present(value, start, end, events)
+        self.position += n
+        events.sort(key=lambda event: event[2])
+        return events
+
+    def release_all(self):
+        """Release every held key now (e.g. when the session stops)."""
+        events = [("release", self.names[action], 0) for action in self._busy
+                  if self.active[action] and self.hold[action]]
+        self.reset()
+        return events
+
+    def _present(self, action, start, end, events):
+        if self.active[action]:
+            self.count[action] = 0
+            return
+        self._busy.add(action)
+        # Samples inside the refractory window do not count towards an onset
+        first = start
+        wait = self.ready_at[action] - (self.position + start)
+        if wait > 0:
+            first = start + wait
+            self.count[action] = 0
+            if first >= end:
+                self._busy.discard(action)
+                return
+        pressed = first + self.onset[action] - self.count[action] - 1
+        if pressed >= end:
+            self.count[action] += end - first
+            return
+        self.active[action] = True
+        self.count[action] = 0
+        events.append(("press" if self.hold[action] else "tap", self.names[action], int(pressed)))
+
+    def _absent(self, action, start, end, events):
+        if not self.active[action]:
+            # An onset that did not last long enough
+            self.count[action] = 0
+            self._busy.discard(action)
+            return
+        released = start + self.offset[action] - self.count[action] - 1
+        if released >= end:
+            self.count[action] += end - start
+            return
+        self.active[action] = False
+        self.count[action] = 0
+        self._busy.discard(action)
+        self.ready_at[action] = self.position + released + self.refractory[action]
+        if self.hold[action]:
+            events.append(("release", self.names[action], int(released)))
@@ -1,191 +1,300 @@
 import webview
-import threading
-import serial
-import numpy as np
-import time
-from collections import deque
-import keyboard
 import json
 import os
+from preset_store import PresetStore
+
+# Serial, keyboard, NumPy and the DSP modules are imported on first use
+# (load_backend / new_session) so the window can show before they load.
 
 # ===============================
 # EMG & Serial Configuration
 # ===============================
-SERIAL_PORT = "COM3"        # Change this as needed
+SERIAL_PORT = "COM3"        # Default port; others can be picked in the UI
 BAUD_RATE = 115200
+SERIAL_FORMAT = "ascii"     # "binary" if Sketch.ino is built with BINARY_FRAMES
+SERIAL_BACKEND = "thread"   # "asyncio": one event loop reads every port (Linux/macOS only)
 BUFFER_SIZE = 64            # Envelope smoothing factor
-COOLDOWN_TIME = 0.5
-last_trigger_time = 0
-
-# Global serial port and control flag 
-ser = None
-running = False
-
-# Global key mapping for each action (default keys)
-action_keys = {
-    "action1": "space",
-    "action2": "left",
-    "action3": "right"
+SAMPLE_RATE = 500           # Must match SAMPLE_RATE in Sketch.ino
+HOST_FILTER = False         # True if Sketch.ino is built with RAW_STREAM
+FILTER_BAND = (74.5, 149.5) # Host band-pass edges in Hz
+FILTER_ORDER = 4
+MODEL_FILE = "model.json"   # Trained classifier (classifier.train_classifier); thresholds if missing
+NORMALIZE = True            # Track baseline drift and gain changes and correct for them (normalize.py)
+OFFLOAD_WORKERS = 0         # >0: run the trained model in this many worker processes
+# Per-action gesture timing in seconds (see gestures.py): the decision must
+# last `onset` to start a gesture and be gone for `offset` to end it, and no
+# new gesture starts within `refractory` of the last one ending. "tap" presses
+# and releases once per gesture; "hold" keeps the key down while it lasts.
+GESTURES = {
+    "action1": {"mode": "tap", "onset": 0.0, "offset": 0.05, "refractory": 0.5},
+    "action2": {"mode": "tap", "onset": 0.0, "offset": 0.05, "refractory": 0.5},
+    "action3": {"mode": "tap", "onset": 0.0, "offset": 0.05, "refractory": 0.5},
 }
+# Where key events go (see actuators.py): "keyboard", "uinput" (virtual
+# keyboard via /dev/uinput, no root), "udp" (JSON datagrams to UDP_TARGET,
+# for games and other programs) or "memory" (kept in a list, for testing)
+ACTUATOR = "keyboard"
+UDP_TARGET = ("127.0.0.1", 5005)
+TAP_INTERVAL = 0.05         # Min seconds between taps of one key; faster ones are coalesced
+QUEUE_SIZE = 256            # Max blocks/actions waiting between pipeline stages
+DROP_POLICY = "drop_oldest" # What a full queue does: "drop_oldest", "drop_newest" or "block"
+RECORD_SESSIONS = True      # Save every session under RECORDINGS_DIR
+RECORDINGS_DIR = "recordings"
+SUMMARY_INTERVAL = 1.0      # Seconds between console summary lines
+UI_CSS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ui", "bootstrap.subset.min.css")
 
-# Circular buffers for smoothing
-buffer1 = deque([0] * BUFFER_SIZE, maxlen=BUFFER_SIZE)
-buffer2 = deque([0] * BUFFER_SIZE, maxlen=BUFFER_SIZE)
+# One Session per board, keyed by port (see session.py); created by load_backend
+manager = None
+hub = None
 
-def get_envelope(data_buffer, new_value):
-    """Compute envelope using a moving average."""
-    data_buffer.append(new_value)
-    return np.mean(data_buffer) * 2
+def load_backend():
+    """Import the serial/DSP side on first use and return the session manager."""
+    global manager, hub
+    if manager is None:
+        from session import SessionManager
+        if SERIAL_BACKEND == "asyncio":
+            from async_serial import AsyncSerialHub
+            hub = AsyncSerialHub()
+        manager = SessionManager()
+    return manager
 
-def process_emg_data():
-    """Reads serial data, computes envelopes, triggers keypresses, and prints output."""
-    global last_trigger_time, running, ser, action_keys
-    while running:
-        current_time = time.time()
+def load_gesture_classifier(thresholds=None):
+    """
+    Use the trained model in MODEL_FILE if there is one, else the threshold
+    rules with the given calibrated thresholds (or the defaults).
+    """
+    from classifier import ThresholdClassifier, load_classifier
+    if os.path.exists(MODEL_FILE):
         try:
-            line = ser.readline().decode('utf-8').strip() if ser else ""
+            classifier = load_classifier(MODEL_FILE)
+            if OFFLOAD_WORKERS:
+                from offload import RemoteClassifier
+                return RemoteClassifier(classifier, workers=OFFLOAD_WORKERS)
+            return classifier
         except Exception as e:
-            print("Serial read error:", e)
-            continue
+            print("Error loading classifier model:", e)
+    return ThresholdClassifier(**(thresholds or {}))
 
-        if line:
-            try:
-                parts = line.split('\t')
-                if len(parts) != 2:
-                    print("Malformed data received")
-                    continue
-                raw1, raw2 = map(int, parts)
-                envelope1 = get_envelope(buffer1, abs(raw1))
-                envelope2 = get_envelope(buffer2, abs(raw2))
-                output = "0"
-
-                # Trigger key actions based on thresholds:
-                if raw1 > 20 and envelope2< 50:
-                    if current_time - last_trigger_time > COOLDOWN_TIME:
-                        last_trigger_time = current_time
-                        keyboard.press_and_release(action_keys["action1"])
-                    output = "1"
-                elif envelope2 > 100:
-                    if envelope1 > 10 and envelope2 > 100:
-                      if current_time - last_trigger_time > COOLDOWN_TIME:
-                          last_trigger_time = current_time
-                          keyboard.press_and_release(action_keys["action3"])
-                      output = "3"
-                    elif envelope2 > 100 and envelope1 <10:
-                      if current_time - last_trigger_time > COOLDOWN_TIME:
-                         last_trigger_time = current_time
-                         keyboard.press_and_release(action_keys["action2"])
-                      output = "2"
-                    
-                # elif envelope2 > 150:
-                #     if current_time - last_trigger_time > COOLDOWN_TIME:
-                #         last_trigger_time = current_time
-                #         keyboard.press_and_release(action_keys["action2"])
-                #     
-                
-
-                timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
-                print(f"{timestamp} | Raw: {raw1}, {raw2} | Envelope: {envelope1:.2f}, {envelope2:.2f} | Output: {output}")
-            except ValueError:
-                print("Malformed data received")
+def new_session(port, action_keys=None, thresholds=None, reference=None):
+    """
+    A Session for one board, configured from the settings above. `reference`
+    is the normalization reference saved with the calibration profile.
+    """
+    from session import Session
+    load_backend()
+    bandpass = None
+    if HOST_FILTER:
+        from dsp import SOSFilter, butter_sos
+        bandpass = SOSFilter(butter_sos(FILTER_ORDER, FILTER_BAND, SAMPLE_RATE), channels=2)
+    normalizer = None
+    if NORMALIZE:
+        from normalize import AdaptiveNormalizer
+        normalizer = AdaptiveNormalizer(channels=2, sample_rate=SAMPLE_RATE)
+        if reference:
+            normalizer.set_reference(reference)
+    return Session(port, load_actuator(), baud_rate=BAUD_RATE, serial_format=SERIAL_FORMAT, channels=2,
+                   action_keys=action_keys, classifier=load_gesture_classifier(thresholds),
+                   window=BUFFER_SIZE, bandpass=bandpass, gestures=GESTURES,
+                   queue_size=QUEUE_SIZE, drop_policy=DROP_POLICY, sample_rate=SAMPLE_RATE,
+                   record_dir=RECORDINGS_DIR if RECORD_SESSIONS else None,
+                   summary_interval=SUMMARY_INTERVAL, hub=hub, normalizer=normalizer)
+
+def load_actuator():
+    """A dispatcher for the ACTUATOR backend; each session gets its own."""
+    from actuators import make_dispatcher
+    options = {"address": UDP_TARGET} if ACTUATOR == "udp" else {}
+    return make_dispatcher(ACTUATOR, tap_interval=TAP_INTERVAL, **options)
+
+def list_serial_ports():
+    """Serial ports present on this machine, for the port picker."""
+    # The page asks for these as soon as it loads, so only pyserial's port
+    # listing is imported here, not the session and DSP modules
+    from serial.tools import list_ports
+    return [{"device": port.device, "description": port.description, "hwid": port.hwid}
+            for port in sorted(list_ports.comports(), key=lambda p: p.device)]
 
 # ===============================
 # JSON Database Functions for Presets
 # ===============================
 PRESETS_FILE = "presets.json"
 
-def load_presets_from_file():
-    """Load presets from the JSON file. Return an empty list if file does not exist."""
-    if not os.path.exists(PRESETS_FILE):
-        return []
-    try:
-        with open(PRESETS_FILE, "r") as f:
-            data = json.load(f)
-            return data.get("presets", [])
-    except Exception as e:
-        print("Error loading presets:", e)
-        return []
-
-def save_presets_to_file(presets):
-    """Save the presets list to the JSON file."""
-    try:
-        with open(PRESETS_FILE, "w") as f:
-            json.dump({"presets": presets}, f, indent=4)
-    except Exception as e:
-        print("Error saving presets:", e)
+# Loaded once; UI calls never touch the file (see preset_store.py)
+store = PresetStore(PRESETS_FILE)
 
 # ===============================
 # Python API Exposed to JS
 # ===============================
 class API:
+    # Methods taking port=None act on the port picked with select_port
+    # (SERIAL_PORT until then), so the single-board UI keeps working.
+
     def __init__(self):
-        self.emg_thread = None
-
-    def start_emg(self, key1, key2, key3):
-        """Update key mappings from dropdowns and start EMG processing."""
-        global running, ser, action_keys
-        action_keys["action1"] = key1
-        action_keys["action2"] = key2
-        action_keys["action3"] = key3
-        if not running:
+        self.port = SERIAL_PORT
+
+    def _session(self, port=None):
+        return manager.get(port or self.port) if manager else None
+
+    # -------- Devices --------
+
+    def list_ports(self):
+        """Return the serial ports on this machine and the selected one."""
+        return {"selected": self.port, "ports": list_serial_ports()}
+
+    def select_port(self, port):
+        self.port = port
+        return self.port
+
+    def get_sessions(self):
+        """Return every board session and whether it is running."""
+        return manager.info() if manager else []
+
+    def start_emg(self, key1, key2, key3, port=None):
+        """Update key mappings from dropdowns and start EMG processing on a port."""
+        port = port or self.port
+        action_keys = {"action1": key1, "action2": key2, "action3": key3}
+        load_backend()
+        current = manager.get(port)
+        if current and current.running:
             try:
-                ser = serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=1)
-            except Exception as e:
-                print("Error opening serial port:", e)
-                return "Error opening serial port"
-            running = True
-            self.emg_thread = threading.Thread(target=process_emg_data, daemon=True)
-            self.emg_thread.start()
-            return "EMG Started with keys: " + json.dumps(action_keys)
-        else:
-            return "EMG is already running"
-
-    def stop_emg(self):
-        global running, ser
-        running = False
-        if ser:
-            ser.close()
-            ser = None
+                current.actuator.check_keys(action_keys.values())
+            except (ValueError, RuntimeError) as e:
+                return str(e)
+            current.action_keys.update(action_keys)
+            return f"EMG is already running on {port}"
+        session = new_session(port, action_keys, self.active_thresholds(), self.active_reference())
+        try:
+            manager.start(session)
+        except (ValueError, RuntimeError) as e:
+            # A key the actuator backend cannot send, a backend that cannot
+            # open, or classifier workers that did not start
+            return str(e)
+        except Exception as e:
+            print("Error opening serial port:", e)
+            return "Error opening serial port"
+        return f"EMG Started on {port} with keys: " + json.dumps(action_keys)
+
+    def stop_emg(self, port=None):
+        """Stop one port, or every running board when port is "all"."""
+        if manager and port == "all":
+            manager.stop_all()
+        elif manager:
+            manager.stop(port or self.port)
         return "EMG Stopped"
 
+    def get_pipeline_stats(self, port=None):
+        """Return queue depth and drop counters for each pipeline stage."""
+        session = self._session(port)
+        return session.pipeline.stats() if session and session.pipeline else {}
+
+    def get_metrics(self, port=None):
+        """Return latency percentiles, throughput and drop counters for a session."""
+        session = self._session(port)
+        return session.get_metrics() if session else {}
+
+    def get_stream(self, cursor=0, port=None):
+        """
+        Scope frames recorded since `cursor` (see streaming.LiveStream.read).
+        Pass the returned cursor back on the next call.
+        """
+        session = self._session(port)
+        return session.live_stream.read(cursor) if session else {"cursor": 0, "count": 0}
+
+    # -------- Calibration --------
+
+    def active_thresholds(self):
+        # Cached calibration is reused at every start instead of recalibrating
+        profile = store.get_profile(store.active_profile)
+        return profile["thresholds"] if profile else None
+
+    def active_reference(self):
+        # Normalization levels the active profile's thresholds were set at
+        profile = store.get_profile(store.active_profile)
+        return profile.get("reference") if profile else None
+
+    def start_calibration(self, phase, port=None):
+        """Start recording a calibration phase: "rest", "ch1" or "ch2"."""
+        session = self._session(port)
+        if not (session and session.running):
+            return "Start EMG before calibrating"
+        try:
+            session.calibrator.start(phase)
+        except ValueError as e:
+            return str(e)
+        return f"Calibrating {phase}"
+
+    def stop_calibration(self, port=None):
+        """Stop the current phase and return the samples collected so far."""
+        session = self._session(port)
+        if not session:
+            return {}
+        session.calibrator.stop()
+        return session.calibrator.progress()
+
+    def get_calibration(self, port=None):
+        session = self._session(port)
+        return session.calibrator.progress() if session else {}
+
+    def save_calibration(self, name, port=None):
+        """Derive thresholds from the recorded phases, store them as a profile and apply it."""
+        session = self._session(port)
+        if not session:
+            return {"error": "Start EMG before calibrating"}
+        try:
+            profile = session.calibrator.profile(name)
+        except ValueError as e:
+            return {"error": str(e)}
+        session.calibrator.reset()
+        if session.normalizer and session.normalizer.ready:
+            # The thresholds are in these units; later sessions map onto them
+            profile["reference"] = session.normalizer.reference()
+        store.put_profile(profile)
+        self.load_profile(name, port)
+        return profile
+
+    def get_profiles(self):
+        """Return the saved calibration profiles and which one is active."""
+        return {"active": store.active_profile, "profiles": list(store.profiles().values())}
+
+    def load_profile(self, name, port=None):
+        """Make a calibration profile active (also for the next start)."""
+        profile = store.get_profile(name)
+        if not profile:
+            return {}
+        store.set_active_profile(name)
+        session = self._session(port)
+        if session:
+            from classifier import ThresholdClassifier
+            if isinstance(session.classifier, ThresholdClassifier):
+                session.classifier = ThresholdClassifier(**profile["thresholds"])
+            if session.normalizer and profile.get("reference"):
+                session.normalizer.set_reference(profile["reference"])
+        return profile
+
+    # -------- Presets --------
+
     def get_presets(self):
         """Return the list of saved presets."""
-        return load_presets_from_file()
+        return store.presets()
 
     def save_preset(self, name, action1, action2, action3):
         """
         Save a new preset or update an existing one.
         Returns the updated list of presets.
         """
-        presets = load_presets_from_file()
-        preset_exists = False
-        for preset in presets:
-            if preset["name"] == name:
-                preset["action1"] = action1
-                preset["action2"] = action2
-                preset["action3"] = action3
-                preset_exists = True
-                break
-        if not preset_exists:
-            presets.append({
-                "name": name,
-                "action1": action1,
-                "action2": action2,
-                "action3": action3
-            })
-        save_presets_to_file(presets)
-        return presets
+        store.put_preset({
+            "name": name,
+            "action1": action1,
+            "action2": action2,
+            "action3": action3
+        })
+        return store.presets()
 
     def load_preset(self, name):
         """Return the preset matching the given name."""
-        presets = load_presets_from_file()
-        for preset in presets:
-            if preset["name"] == name:
-                return preset
-        return {}
+        return store.get_preset(name) or {}
 
 # ===============================
-# HTML UI with Bootstrap (with inline Save Preset field)
+# HTML UI with Bootstrap (local subset, with inline Save Preset field)
 # ===============================
 html_content = """
 <!DOCTYPE html>
@@ -194,7 +303,8 @@ html_content = """
   <meta charset="UTF-8">
   <meta name="viewport" content="width=device-width, initial-scale=1">
   <title>EMG Gesture Control</title>
-  <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
+  <!-- Local Bootstrap subset, inlined so the page renders offline without a network fetch -->
+  <style>/* UI_CSS */</style>
   <style>
     #sidebar { height: 420px; overflow-y: auto; }
   </style>
@@ -380,18 +490,31 @@ html_content = """
           </div>
         </div>
         <!-- EMG Control Buttons -->
-        <div class="d-flex justify-content-center my-3">
+        <div class="d-flex justify-content-center align-items-center my-3">
+          <select class="form-select form-select-sm mx-2" id="portDropdown" style="width: 220px;" onchange="selectPort()"></select>
           <button onclick="startEMG()" class="btn btn-success mx-2">Start EMG</button>
           <button onclick="stopEMG()" class="btn btn-danger mx-2">Stop EMG</button>
         </div>
+        <!-- Calibration: record rest and a contraction on each channel -->
+        <div class="d-flex justify-content-center align-items-center my-3">
+          <button onclick="calibrate('rest')" class="btn btn-outline-light btn-sm mx-1">Rest</button>
+          <button onclick="calibrate('ch1')" class="btn btn-outline-light btn-sm mx-1">Contract Ch1</button>
+          <button onclick="calibrate('ch2')" class="btn btn-outline-light btn-sm mx-1">Contract Ch2</button>
+          <input type="text" id="profileNameInput" class="form-control form-control-sm mx-1" style="width: 140px;" placeholder="Profile name">
+          <button onclick="saveCalibration()" class="btn btn-primary btn-sm mx-1">Save Profile</button>
+        </div>
+        <div id="calibrationStatus" class="small text-center text-secondary"></div>
         <!-- Output Label -->
         
+        <!-- Live scope: envelopes (ch1 green, ch2 blue) and decision history -->
+        <canvas id="scope" width="760" height="140" class="w-100 rounded" style="background-color: #1F2022;"></canvas>
+        <!-- Live latency / throughput metrics -->
+        <div id="metricsPanel" class="small font-monospace text-center text-secondary"></div>
       </div>
     </div>
   </div>
 
-  <!-- Bootstrap Bundle JS and Custom Script -->
-  <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
+  <!-- Custom Script (no Bootstrap JS: the page uses no JS components) -->
   <script>
     // Start and Stop EMG functions
     function startEMG() {
@@ -400,11 +523,131 @@ html_content = """
       var key3 = document.getElementById('action3Dropdown').value;
       window.pywebview.api.start_emg(key1, key2, key3).then(response => {
         console.log(response);
+        if (!metricsTimer) {
+          metricsTimer = setInterval(updateMetrics, 1000);
+          scopeTimer = setInterval(updateScope, 1000 / 30);
+        }
       });
     }
     function stopEMG() {
       window.pywebview.api.stop_emg().then(response => {
         console.log(response);
+        clearInterval(metricsTimer);
+        clearInterval(scopeTimer);
+        metricsTimer = null;
+      });
+    }
+
+    // Serial port picker; start/stop/metrics/scope act on the selected port
+    function loadPorts() {
+      window.pywebview.api.list_ports().then(result => {
+        const dropdown = document.getElementById('portDropdown');
+        dropdown.innerHTML = "";
+        const devices = result.ports.map(p => p.device);
+        if (!devices.includes(result.selected)) {
+          result.ports.unshift({device: result.selected, description: "default"});
+        }
+        result.ports.forEach(p => {
+          let option = document.createElement('option');
+          option.value = p.device;
+          option.textContent = p.device + " - " + p.description;
+          option.selected = p.device === result.selected;
+          dropdown.appendChild(option);
+        });
+      });
+    }
+    function selectPort() {
+      window.pywebview.api.select_port(document.getElementById('portDropdown').value);
+      scopeCursor = 0;
+      scopeHistory = [];
+    }
+
+    // Live scope: pull new frames since the last cursor and redraw
+    var scopeTimer = null;
+    var scopeCursor = 0;
+    var scopeBusy = false;
+    var SCOPE_FRAMES = 300;
+    var scopeHistory = [];
+    var DECISION_COLORS = ["#1F2022", "#ffc107", "#0dcaf0", "#d63384", "#20c997"];
+    function updateScope() {
+      if (scopeBusy) return;
+      scopeBusy = true;
+      window.pywebview.api.get_stream(scopeCursor).then(batch => {
+        scopeBusy = false;
+        scopeCursor = batch.cursor;
+        if (!batch.count) return;
+        const bytes = Uint8Array.from(atob(batch.data), c => c.charCodeAt(0));
+        const values = new Float32Array(bytes.buffer);
+        for (let i = 0; i < batch.count; i++) {
+          // [envelope1, envelope2, raw1, raw2, decision]
+          scopeHistory.push(values.subarray(i * batch.width, (i + 1) * batch.width));
+        }
+        scopeHistory = scopeHistory.slice(-SCOPE_FRAMES);
+        drawScope();
+      }, () => { scopeBusy = false; });
+    }
+    function drawScope() {
+      const canvas = document.getElementById('scope');
+      const ctx = canvas.getContext('2d');
+      const w = canvas.width, h = canvas.height - 10;
+      ctx.clearRect(0, 0, canvas.width, canvas.height);
+      let peak = 50;
+      scopeHistory.forEach(f => { peak = Math.max(peak, f[0], f[1]); });
+      const dx = w / SCOPE_FRAMES;
+      scopeHistory.forEach((f, i) => {
+        ctx.fillStyle = DECISION_COLORS[f[4] % DECISION_COLORS.length];
+        ctx.fillRect(i * dx, h + 2, Math.ceil(dx), 8);
+      });
+      ["#198754", "#0d6efd"].forEach((color, ch) => {
+        ctx.strokeStyle = color;
+        ctx.beginPath();
+        scopeHistory.forEach((f, i) => {
+          const y = h - (f[ch] / peak) * h;
+          if (i === 0) ctx.moveTo(0, y); else ctx.lineTo(i * dx, y);
+        });
+        ctx.stroke();
+      });
+    }
+
+    // Record one calibration phase for a few seconds
+    var CALIBRATION_SECONDS = 5;
+    function calibrate(phase) {
+      window.pywebview.api.start_calibration(phase).then(response => {
+        document.getElementById('calibrationStatus').textContent = response;
+        if (response.startsWith("Calibrating")) {
+          setTimeout(() => {
+            window.pywebview.api.stop_calibration().then(progress => {
+              const s = progress.samples;
+              document.getElementById('calibrationStatus').textContent =
+                "Recorded samples - rest: " + s.rest + ", ch1: " + s.ch1 + ", ch2: " + s.ch2;
+            });
+          }, CALIBRATION_SECONDS * 1000);
+        }
+      });
+    }
+    function saveCalibration() {
+      var name = document.getElementById('profileNameInput').value;
+      if (!name) {
+        alert("Please enter a profile name.");
+        return;
+      }
+      window.pywebview.api.save_calibration(name).then(profile => {
+        document.getElementById('calibrationStatus').textContent = profile.error ||
+          "Profile " + profile.name + " active: " + JSON.stringify(profile.thresholds);
+      });
+    }
+
+    // Poll hot-path metrics once a second while EMG is running
+    var metricsTimer = null;
+    function updateMetrics() {
+      window.pywebview.api.get_metrics().then(m => {
+        const e2e = m.latency.end_to_end;
+        const env = m.latency.envelope;
+        document.getElementById('metricsPanel').textContent =
+          m.samples_per_sec + " samples/s | envelope p99 " + env.p99_us.toFixed(0) + " us" +
+          " | sample-to-key p50/p95/p99/max " + [e2e.p50_us, e2e.p95_us, e2e.p99_us, e2e.max_us]
+            .map(v => (v / 1000).toFixed(1)).join("/") + " ms" +
+          " | malformed " + (m.malformed_lines || 0) + " | dropped " + (m.dropped_frames || 0);
       });
     }
 
@@ -430,6 +673,7 @@ html_content = """
       });
     }
 
+    window.addEventListener('pywebviewready', loadPorts);
     document.addEventListener('DOMContentLoaded', function() {
       loadPresets();
       // Save preset using the inline input field and Save button
@@ -458,10 +702,19 @@ html_content = """
 </html>
 """
 
+with open(UI_CSS) as f:
+    html_content = html_content.replace("/* UI_CSS */", f.read())
+
 if __name__ == "__main__":
     api = API()
     webview.create_window("EMG Gesture Control", html=html_content, js_api=api, width=800, height=600)
+    store.start()
     webview.start()
+    if manager:
+        manager.stop_all()
+    if hub:
+        hub.close()
+    store.close()
     """
     Features to add:
     Setting:
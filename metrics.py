@@ -0,0 +1,123 @@
+import time
+
+# ===============================
+# Latency & Throughput Metrics
+# ===============================
+# Every histogram has a single writer thread (the stage that owns it), so
+# recording is a plain list increment with no locks. Readers such as
+# API.get_metrics only take a snapshot copy.
+
+SUB_BUCKETS = 4             # Buckets per power of two (~25% resolution)
+NUM_BUCKETS = 256           # Covers up to ~2**60 ns
+
+
+def _bucket(value):
+    if value < SUB_BUCKETS:
+        return max(value, 0)
+    shift = value.bit_length() - 3
+    return (shift << 2) + (value >> shift)
+
+
+def _bucket_upper(index):
+    """Largest value that falls into bucket `index`."""
+    if index < SUB_BUCKETS:
+        return index
+    shift = (index >> 2) - 1
+    return (((index & 3) + 5) << shift) - 1
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram of nanosecond durations."""
+
+    def __init__(self, name):
+        self.name = name
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns):
+        self.counts[_bucket(ns)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, q, counts=None):
+        """Upper bound (ns) of the bucket holding the q-th percentile."""
+        counts = counts if counts is not None else list(self.counts)
+        total = sum(counts)
+        if not total:
+            return 0
+        target = q / 100 * total
+        running = 0
+        for index, count in enumerate(counts):
+            running += count
+            if running >= target:
+                return min(_bucket_upper(index), self.max)
+        return self.max
+
+    def snapshot(self):
+        """p50/p95/p99/max/mean in microseconds."""
+        counts = list(self.counts)
+        count = self.count
+        return {
+            "count": count,
+            "p50_us": self.percentile(50, counts) / 1e3,
+            "p95_us": self.percentile(95, counts) / 1e3,
+            "p99_us": self.percentile(99, counts) / 1e3,
+            "max_us": min(self.max, _bucket_upper(NUM_BUCKETS - 1)) / 1e3,
+            "mean_us": self.total / count / 1e3 if count else 0.0,
+        }
+
+
+class PipelineMetrics:
+    """
+    Timestamps along the hot path: read -> parse -> envelope -> classify -> actuate.
+    Each stage records its own durations; end_to_end runs from the moment the
+    bytes arrived from the port until the key press returned.
+    """
+
+    def __init__(self):
+        self.parse = LatencyHistogram("parse")
+        self.queue = LatencyHistogram("queue")
+        self.envelope = LatencyHistogram("envelope")
+        self.classify = LatencyHistogram("classify")
+        self.actuate = LatencyHistogram("actuate")
+        self.end_to_end = LatencyHistogram("end_to_end")
+        self.histograms = {h.name: h for h in (
+            self.parse, self.queue, self.envelope, self.classify, self.actuate, self.end_to_end)}
+        self.samples = 0
+        self.blocks = 0
+        self.actions = 0
+        self._started = time.perf_counter_ns()
+        self._last_rate = (self._started, 0)
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+        self.samples = self.blocks = self.actions = 0
+        self._started = time.perf_counter_ns()
+        self._last_rate = (self._started, 0)
+
+    def samples_per_second(self):
+        """Sample rate since the previous call (or since start on the first call)."""
+        now = time.perf_counter_ns()
+        last_time, last_samples = self._last_rate
+        samples = self.samples
+        self._last_rate = (now, samples)
+        elapsed = now - last_time
+        return (samples - last_samples) * 1e9 / elapsed if elapsed else 0.0
+
+    def snapshot(self):
+        return {
+            "samples": self.samples,
+            "blocks": self.blocks,
+            "actions": self.actions,
+            "samples_per_sec": round(self.samples_per_second(), 1),
+            "uptime_s": round((time.perf_counter_ns() - self._started) / 1e9, 1),
+            "latency": {name: histogram.snapshot() for name, histogram in self.histograms.items()},
+        }
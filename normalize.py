@@ -0,0 +1,125 @@
+import numpy as np
+
+# ===============================
+# Adaptive Baseline & Gain
+# ===============================
+# Electrode drift and fatigue shift the board's envelope levels over a
+# session, and fixed thresholds drift with them. Per channel, this tracks
+# the rest baseline (a low running percentile) and the contraction level (a
+# high one), then maps each sample back onto the levels seen when the
+# thresholds were set:
+#
+#   out = (x - baseline) * reference_spread / spread + reference_baseline
+#
+# The percentiles use the streaming quantile update q += step * (tau - [x < q]),
+# summed over a block, so each block costs O(1) state and a couple of vector
+# ops into preallocated buffers. Baselines fall quickly and rise slowly;
+# contraction levels rise quickly and fall slowly.
+#
+# The reference levels are whatever the trackers settled on after the warmup,
+# unless a calibration profile supplies its own; thresholds derived from a
+# profile then keep their meaning in later sessions.
+
+BASELINE_QUANTILE = 0.1
+CONTRACTION_QUANTILE = 0.95
+BASELINE_TIME = 20.0        # Seconds for the baseline to follow a full-spread shift
+CONTRACTION_TIME = 120.0    # ... and for the contraction level
+WARMUP_TIME = 10.0          # Seconds of pass-through before references are taken
+MAX_GAIN = 2.0              # Gain is kept within [1 / MAX_GAIN, MAX_GAIN]
+MIN_SPREAD = 1.0            # Floor for contraction - baseline (ADC units)
+
+
+class AdaptiveNormalizer:
+    """Per-channel drift and gain correction for (N, channels) blocks."""
+
+    def __init__(self, channels=2, sample_rate=500, baseline_time=BASELINE_TIME,
+                 contraction_time=CONTRACTION_TIME, warmup=WARMUP_TIME, max_gain=MAX_GAIN):
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.quantiles = np.array([BASELINE_QUANTILE, CONTRACTION_QUANTILE])
+        # Per-sample step as a fraction of the spread; dividing by the smaller
+        # tail makes the slow direction take about the configured time
+        times = np.array([baseline_time, contraction_time])
+        self._rates = 1.0 / (times * sample_rate * np.minimum(self.quantiles, 1 - self.quantiles))
+        self.warmup = int(warmup * sample_rate)
+        self.max_gain = max_gain
+        self._scratch = np.empty((0, channels))
+        self._below = np.empty(channels)
+        self._step = np.empty(channels)
+        self.reference_baseline = np.zeros(channels)
+        self.reference_spread = np.ones(channels)
+        self._referenced = False
+        self.reset()
+
+    def reset(self):
+        self.baseline = np.zeros(self.channels)
+        self.contraction = np.zeros(self.channels)
+        self.gain = np.ones(self.channels)
+        self.samples = 0
+        self.ready = False
+
+    @property
+    def spread(self):
+        return np.maximum(self.contraction - self.baseline, MIN_SPREAD)
+
+    def reference(self):
+        """Reference levels, as stored in a calibration profile."""
+        return {"baseline": self.reference_baseline.tolist(), "spread": self.reference_spread.tolist()}
+
+    def set_reference(self, reference):
+        """Map onto these levels (from reference()) instead of the ones seen after warmup."""
+        self.reference_baseline = np.array(reference["baseline"], dtype=np.float64)
+        self.reference_spread = np.maximum(np.array(reference["spread"], dtype=np.float64), MIN_SPREAD)
+        self._referenced = True
+
+    def process_block(self, block):
+        """
+        Update the trackers with a block and return the corrected block.
+        The result is a view of an internal buffer, valid until the next call.
+        """
+        n = len(block)
+        if n == 0:
+            return np.asarray(block, dtype=np.float64)
+        if len(self._scratch) < n:
+            self._scratch = np.empty((n, self.channels))
+        out = self._scratch[:n]
+        if self.samples == 0:
+            self.baseline[:], self.contraction[:] = np.quantile(block, self.quantiles, axis=0)
+        self.samples += n
+
+        spread = self.spread
+        for level, tau, rate in zip((self.baseline, self.contraction), self.quantiles, self._rates):
+            # Steps scale with the spread, or with the block's distance from
+            # the level if that is larger, so a level far off (e.g. right
+            # after the first block) catches up in seconds
+            np.subtract(block, level, out=out)
+            np.abs(out, out=out)
+            out.max(axis=0, out=self._step)
+            np.maximum(self._step, spread, out=self._step)
+            np.less(block, level, out=out)
+            out.sum(axis=0, out=self._below)
+            # sum of (tau - [x < q]) over the block
+            level += rate * self._step * (tau * n - self._below)
+
+        if not self.ready:
+            if self.samples < self.warmup:
+                np.copyto(out, block)
+                return out
+            if not self._referenced:
+                self.reference_baseline = self.baseline.copy()
+                self.reference_spread = self.spread
+            self.ready = True
+        np.divide(self.reference_spread, self.spread, out=self.gain)
+        np.clip(self.gain, 1.0 / self.max_gain, self.max_gain, out=self.gain)
+        np.subtract(block, self.baseline, out=out)
+        out *= self.gain
+        out += self.reference_baseline
+        return out
+
+    def state(self):
+        return {
+            "ready": self.ready,
+            "baseline": self.baseline.tolist(),
+            "contraction": self.contraction.tolist(),
+            "gain": self.gain.tolist(),
+        }
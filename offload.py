@@ -0,0 +1,248 @@
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from classifier import MODELS
+from metrics import LatencyHistogram
+
+# ===============================
+# Process-pool Classification
+# ===============================
+# Feature extraction stays in the DSP thread (it is a few vectorized sums);
+# model inference runs in worker processes so a heavy model never holds the
+# GIL that the serial reader needs. Feature rows go out and decisions come
+# back through shared-memory rings, one request/result pair per worker,
+# so no sample arrays are pickled. The DSP thread never waits on a worker:
+# decisions are applied as they arrive, and when too many windows are still
+# in flight new ones are dropped and counted instead of queueing up.
+
+OFFLOAD_RING = 1024         # Rows per shared-memory ring
+_HEADER = 16                # head (rows written) and tail (rows read), int64 each
+
+
+class SharedRing:
+    """
+    Single-producer/single-consumer ring of float64 rows in shared memory.
+    The producer only moves head and the consumer only moves tail, so no lock
+    is needed across processes.
+    """
+
+    def __init__(self, width, capacity=OFFLOAD_RING, name=None):
+        self.width = width
+        self.capacity = capacity
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=_HEADER + capacity * width * 8)
+            self._owner = True
+        else:
+            # Workers share the parent's resource tracker, so attaching does
+            # not take ownership; only the creator unlinks the block
+            self.shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+        self._counters = np.ndarray(2, dtype=np.int64, buffer=self.shm.buf)
+        self._rows = np.ndarray((capacity, width), dtype=np.float64, buffer=self.shm.buf, offset=_HEADER)
+        if self._owner:
+            self._counters[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def depth(self):
+        return int(self._counters[0] - self._counters[1])
+
+    def put(self, rows):
+        """Append as many rows as fit; returns how many were written."""
+        head, tail = int(self._counters[0]), int(self._counters[1])
+        count = min(len(rows), self.capacity - (head - tail))
+        start = head % self.capacity
+        first = min(count, self.capacity - start)
+        self._rows[start:start + first] = rows[:first]
+        self._rows[:count - first] = rows[first:count]
+        # Publish only after the rows are in place
+        self._counters[0] = head + count
+        return count
+
+    def get(self):
+        """Remove and return every row written so far."""
+        head, tail = int(self._counters[0]), int(self._counters[1])
+        start = tail % self.capacity
+        count = head - tail
+        if start + count <= self.capacity:
+            rows = self._rows[start:start + count].copy()
+        else:
+            rows = np.concatenate((self._rows[start:], self._rows[:start + count - self.capacity]))
+        self._counters[1] = head
+        return rows
+
+    def close(self):
+        del self._counters, self._rows
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def _worker(model_data, requests_name, results_name, width, capacity, doorbell, ready, stop):
+    """Worker process: predict every feature row and write [seq, sent_ns, decision] back."""
+    model = MODELS[model_data["kind"]].from_dict(model_data)
+    requests = SharedRing(width, capacity, name=requests_name)
+    results = SharedRing(3, capacity, name=results_name)
+    ready.set()
+    try:
+        while not stop.is_set():
+            if not doorbell.acquire(timeout=0.1):
+                continue
+            rows = requests.get()
+            if len(rows):
+                decisions = model.predict(rows[:, 2:])
+                results.put(np.column_stack((rows[:, :2], decisions)))
+    finally:
+        requests.close()
+        results.close()
+
+
+class RemoteClassifier:
+    """
+    ModelClassifier with inference in `workers` processes. Same classify()
+    interface; decisions lag by however long the workers take (usually
+    less than a block) and hold until the next one arrives.
+    """
+
+    input = "signal"
+
+    def __init__(self, classifier, workers=1, capacity=OFFLOAD_RING):
+        self.classifier = classifier
+        self.extractor = classifier.extractor
+        self.workers = workers
+        self.capacity = capacity
+        self.latency = LatencyHistogram("offload")
+        self._pool = []
+        self.reset()
+
+    def reset(self):
+        self.extractor.reset()
+        self._last = 0
+        self._seq = 0
+        self._next = 0          # Next sequence number to apply
+        self._done = {}         # Out-of-order decisions by sequence number
+        self._skipped = set()   # Sequence numbers that were dropped
+        self._turn = 0
+        self.sent = 0
+        self.completed = 0
+        self.dropped = 0
+        self.high_water = 0
+        self.latency.reset()
+
+    def start(self, timeout=10.0):
+        """
+        Spawn the worker processes (spawn, not fork: the parent has running
+        threads) and wait until each has loaded the model. Raises
+        RuntimeError, with the pool closed again, if one does not come up.
+        """
+        if self._pool:
+            return
+        context = multiprocessing.get_context("spawn")
+        width = 2 + self.extractor.size
+        model_data = self.classifier.model.to_dict()
+        readies = []
+        for _ in range(self.workers):
+            requests = SharedRing(width, self.capacity)
+            results = SharedRing(3, self.capacity)
+            doorbell = context.Semaphore(0)
+            ready = context.Event()
+            stop = context.Event()
+            process = context.Process(
+                target=_worker, name="emg-classifier", daemon=True,
+                args=(model_data, requests.name, results.name, width, self.capacity, doorbell, ready, stop))
+            process.start()
+            self._pool.append((process, requests, results, doorbell, stop))
+            readies.append(ready)
+        deadline = time.monotonic() + timeout
+        for ready, (process, _, _, _, _) in zip(readies, self._pool):
+            # Poll so a worker that dies while loading fails fast
+            while not ready.wait(0.05):
+                if not process.is_alive() or time.monotonic() > deadline:
+                    code = process.exitcode
+                    self.close()
+                    reason = f"exited with code {code}" if code is not None else f"not ready after {timeout} s"
+                    raise RuntimeError(f"Classifier worker {reason}")
+
+    def close(self):
+        for process, requests, results, doorbell, stop in self._pool:
+            stop.set()
+            doorbell.release()
+            process.join(2.0)
+            if process.is_alive():
+                process.terminate()
+            requests.close()
+            results.close()
+        self._pool = []
+
+    @property
+    def inflight(self):
+        return self.sent - self.completed
+
+    def classify(self, raw, env):
+        self._collect()
+        features, ends = self.extractor.process_block(raw)
+        if len(ends):
+            self._send(features)
+        return np.full(len(raw), self._last, dtype=np.int64)
+
+    def _send(self, features):
+        count = len(features)
+        # Backpressure: results must always fit in the result rings
+        room = max(0, self.capacity - self.inflight)
+        if count > room:
+            self.dropped += count - room
+            features = features[count - room:]
+            count = room
+        if count == 0:
+            return
+        process, requests, results, doorbell, stop = self._pool[self._turn]
+        rows = np.empty((count, 2 + features.shape[1]))
+        rows[:, 0] = np.arange(self._seq, self._seq + count)
+        rows[:, 1] = time.perf_counter_ns()
+        rows[:, 2:] = features
+        written = requests.put(rows)
+        if written < count:
+            # That worker is behind; skip these windows
+            self.dropped += count - written
+            self._skipped.update(range(self._seq + written, self._seq + count))
+        self._seq += count
+        self.sent += written
+        self.high_water = max(self.high_water, requests.depth)
+        doorbell.release()
+        self._turn = (self._turn + 1) % len(self._pool)
+
+    def _collect(self):
+        """Apply every decision that came back, in window order."""
+        now = time.perf_counter_ns()
+        for process, requests, results, doorbell, stop in self._pool:
+            for seq, sent_ns, decision in results.get().tolist():
+                self._done[int(seq)] = int(decision)
+                self.latency.record(now - int(sent_ns))
+                self.completed += 1
+        while True:
+            if self._next in self._done:
+                self._last = self._done.pop(self._next)
+            elif self._next in self._skipped:
+                self._skipped.discard(self._next)
+            else:
+                break
+            self._next += 1
+
+    def stats(self):
+        """Backpressure counters and round-trip latency for get_metrics."""
+        return {
+            "workers": len(self._pool),
+            "sent": self.sent,
+            "completed": self.completed,
+            "inflight": self.inflight,
+            "dropped": self.dropped,
+            "ring_depth": sum(requests.depth for _, requests, _, _, _ in self._pool),
+            "ring_high_water": self.high_water,
+            "round_trip": self.latency.snapshot(),
+        }
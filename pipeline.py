@@ -0,0 +1,252 @@
+import queue
+import threading
+import time
+
+from metrics import PipelineMetrics
+
+# ===============================
+# Staged Processing Pipeline
+# ===============================
+# reader -> DSP/classifier -> actuator (+ logger), each in its own thread and
+# joined by bounded channels, so a blocking keypress or a slow console never
+# holds up serial reading.
+
+DROP_OLDEST = "drop_oldest"     # Make room by discarding the oldest item
+DROP_NEWEST = "drop_newest"     # Discard the item being put
+BLOCK = "block"                 # Wait for room (never drops)
+ACTUATE_BATCH = 64              # Most actions handed to the actuator at once
+
+_CLOSED = object()
+
+
+class Channel:
+    """Bounded queue between two stages with a drop policy and depth counters."""
+
+    def __init__(self, name, maxsize=256, policy=DROP_OLDEST):
+        if policy not in (DROP_OLDEST, DROP_NEWEST, BLOCK):
+            raise ValueError(f"Unknown drop policy: {policy}")
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        self.put_count = 0
+        self.dropped = 0
+        self.high_water = 0
+        self._queue = queue.SimpleQueue()
+        # One slot per queued item; the consumer gives slots back
+        self._slots = threading.Semaphore(maxsize)
+
+    def put(self, item):
+        """Queue an item. Returns False if the item itself was dropped."""
+        if not self._slots.acquire(blocking=self.policy == BLOCK):
+            if self.policy == DROP_NEWEST:
+                self.dropped += 1
+                return False
+            try:
+                # Take over the slot of the oldest item
+                self._queue.get_nowait()
+            except queue.Empty:
+                # The consumer just freed a slot
+                self._slots.acquire()
+            self.dropped += 1
+        self._queue.put(item)
+        self.put_count += 1
+        depth = self._queue.qsize()
+        if depth > self.high_water:
+            self.high_water = depth
+        return True
+
+    def get(self, timeout=None):
+        """Return the next item, or raise queue.Empty on timeout / EOFError once closed."""
+        item = self._queue.get(timeout=timeout)
+        if item is _CLOSED:
+            # Leave the marker for any other consumer
+            self._queue.put(_CLOSED)
+            raise EOFError(self.name)
+        self._slots.release()
+        return item
+
+    def get_many(self, limit):
+        """
+        Wait for the next item, then take whatever else is already queued, up
+        to `limit` items in all. Raises EOFError only if nothing was left.
+        """
+        items = [self.get()]
+        while len(items) < limit:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _CLOSED:
+                self._queue.put(_CLOSED)
+                break
+            self._slots.release()
+            items.append(item)
+        return items
+
+    def close(self):
+        """Wake the consumer and make it stop once the queue is drained."""
+        self._queue.put(_CLOSED)
+
+    @property
+    def depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        return {
+            "depth": self.depth,
+            "high_water": self.high_water,
+            "put": self.put_count,
+            "dropped": self.dropped,
+        }
+
+
+class Pipeline:
+    """
+    Runs reader.read_block() -> process(block) -> actuate(actions) / log(text)
+    in separate threads. process() returns (actions, text); either may be empty.
+    actuate() gets every action queued since its last call, as a list.
+    The reader sets `arrival_ns` for every block so latency can be traced to
+    the key press in `metrics`.
+    """
+
+    def __init__(self, reader, process, actuate, log=print, maxsize=256, policy=DROP_OLDEST, metrics=None):
+        self.reader = reader
+        self.process = process
+        self.actuate = actuate
+        self.log = log
+        self.samples = Channel("samples", maxsize, policy)
+        self.actions = Channel("actions", maxsize, policy)
+        self.logs = Channel("logs", maxsize, policy)
+        self.metrics = metrics or PipelineMetrics()
+        self._running = threading.Event()
+        self._threads = []
+        self._fed = False
+
+    @property
+    def running(self):
+        return self._running.is_set()
+
+    def start(self, read=True):
+        """
+        Start the stage threads. With read=False there is no reader/DSP thread:
+        the owner pushes blocks with feed() from its own loop instead.
+        """
+        self._running.set()
+        self._fed = not read
+        self._threads = [
+            threading.Thread(target=self._actuate_loop, name="emg-actuator", daemon=True),
+            threading.Thread(target=self._drain, args=(self.logs, self.log), name="emg-logger", daemon=True),
+        ]
+        if read:
+            self._threads[:0] = [
+                threading.Thread(target=self._read_loop, name="emg-reader", daemon=True),
+                threading.Thread(target=self._process_loop, name="emg-dsp", daemon=True),
+            ]
+        for thread in self._threads:
+            thread.start()
+
+    def feed(self, block, arrival):
+        """Process a block read elsewhere (see start(read=False)) on the caller's thread."""
+        parsed = time.perf_counter_ns()
+        self.metrics.parse.record(parsed - arrival)
+        self._handle(arrival, parsed, block)
+
+    def halt(self):
+        """
+        Tell the stages to finish without waiting for them. Call this before
+        waking a blocked reader, so it sees the flag instead of reading again.
+        """
+        if not self._running.is_set():
+            return
+        self._running.clear()
+        if self._fed:
+            self.actions.close()
+            self.logs.close()
+
+    def stop(self, timeout=2.0):
+        """Stop reading, let the later stages drain, and join every thread."""
+        self.halt()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def stats(self):
+        """Per-channel queue depth and drop counters."""
+        return {channel.name: channel.stats() for channel in (self.samples, self.actions, self.logs)}
+
+    def _read_loop(self):
+        metrics = self.metrics
+        try:
+            while self._running.is_set():
+                try:
+                    block = self.reader.read_block()
+                except Exception as e:
+                    if self._running.is_set():
+                        print("Serial read error:", e)
+                    continue
+                if len(block):
+                    parsed = time.perf_counter_ns()
+                    arrival = self.reader.arrival_ns
+                    metrics.parse.record(parsed - arrival)
+                    self.samples.put((arrival, parsed, block))
+        finally:
+            self.samples.close()
+
+    def _process_loop(self):
+        try:
+            while True:
+                try:
+                    arrival, parsed, block = self.samples.get()
+                except EOFError:
+                    break
+                self.metrics.queue.record(time.perf_counter_ns() - parsed)
+                self._handle(arrival, parsed, block)
+        finally:
+            self.actions.close()
+            self.logs.close()
+
+    def _handle(self, arrival, parsed, block):
+        """DSP/classifier stage for one block; hands actions and text to the later stages."""
+        metrics = self.metrics
+        try:
+            actions, text = self.process(block)
+        except Exception as e:
+            print("Processing error:", e)
+            return
+        metrics.samples += len(block)
+        metrics.blocks += 1
+        classified = time.perf_counter_ns()
+        for action in actions:
+            self.actions.put((action, arrival, classified))
+        if text:
+            self.logs.put(text)
+
+    def _actuate_loop(self):
+        metrics = self.metrics
+        while True:
+            try:
+                batch = self.actions.get_many(ACTUATE_BATCH)
+            except EOFError:
+                break
+            try:
+                self.actuate([action for action, _, _ in batch])
+            except Exception as e:
+                print("actions stage error:", e)
+                continue
+            done = time.perf_counter_ns()
+            for _, arrival, classified in batch:
+                metrics.actuate.record(done - classified)
+                metrics.end_to_end.record(done - arrival)
+            metrics.actions += len(batch)
+
+    @staticmethod
+    def _drain(channel, handler):
+        while True:
+            try:
+                item = channel.get()
+            except EOFError:
+                break
+            try:
+                handler(item)
+            except Exception as e:
+                print(f"{channel.name} stage error:", e)
@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+import time
+
+# ===============================
+# Preset Repository
+# ===============================
+# presets.json is read once into name-indexed dicts and every UI call is
+# served from memory. Changes are written back by a background thread,
+# debounced so a burst of saves costs one write, and atomically (temp file
+# + rename) so a crash never leaves a half-written file. The same thread
+# watches the file's mtime and reloads it if someone edits it by hand.
+
+SAVE_DELAY = 0.5            # Seconds to wait for more changes before writing
+POLL_INTERVAL = 2.0         # Seconds between checks for outside edits
+
+
+class PresetStore:
+    """Presets and calibration profiles from presets.json, kept in memory."""
+
+    def __init__(self, path, save_delay=SAVE_DELAY, poll_interval=POLL_INTERVAL):
+        self.path = path
+        self.save_delay = save_delay
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._changed_at = 0.0
+        self._mtime = None
+        self._thread = None
+        self._load()
+
+    # -------- Reads (memory only) --------
+
+    def presets(self):
+        with self._lock:
+            return [dict(p) for p in self._presets.values()]
+
+    def get_preset(self, name):
+        with self._lock:
+            preset = self._presets.get(name)
+            return dict(preset) if preset else None
+
+    def profiles(self):
+        with self._lock:
+            return dict(self._profiles)
+
+    def get_profile(self, name):
+        with self._lock:
+            return self._profiles.get(name)
+
+    @property
+    def active_profile(self):
+        return self._data.get("active_profile")
+
+    # -------- Writes (persisted in the background) --------
+
+    def put_preset(self, preset):
+        """Insert or update a preset by name."""
+        with self._lock:
+            self._presets[preset["name"]] = dict(preset)
+            self._schedule_save()
+
+    def put_profile(self, profile):
+        with self._lock:
+            self._profiles[profile["name"]] = profile
+            self._schedule_save()
+
+    def set_active_profile(self, name):
+        with self._lock:
+            self._data["active_profile"] = name
+            self._schedule_save()
+
+    def start(self):
+        """Start the background writer / outside-edit watcher."""
+        if self._thread is None:
+            self._closed.clear()
+            self._thread = threading.Thread(target=self._run, name="preset-writer", daemon=True)
+            self._thread.start()
+
+    def flush(self):
+        """Write pending changes now."""
+        if self._dirty.is_set():
+            self._dirty.clear()
+            self._save()
+
+    def close(self):
+        """Stop the background thread and write anything still pending."""
+        self._closed.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    # -------- Internals --------
+
+    def _load(self):
+        data = {}
+        mtime = None
+        if os.path.exists(self.path):
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+            except Exception as e:
+                print("Error loading presets:", e)
+                data = {}
+        with self._lock:
+            if self._dirty.is_set():
+                # Changed here while the file was read: keep those changes,
+                # the next save writes them over the outside edit
+                return
+            self._data = data
+            self._presets = {p["name"]: p for p in data.get("presets", [])}
+            self._profiles = {p["name"]: p for p in data.get("profiles", [])}
+            self._mtime = mtime
+
+    def _snapshot(self):
+        with self._lock:
+            data = dict(self._data)
+            data["presets"] = list(self._presets.values())
+            data["profiles"] = list(self._profiles.values())
+            return data
+
+    def _save(self):
+        data = self._snapshot()
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(data, f, indent=4)
+            os.replace(tmp, self.path)
+            self._mtime = os.stat(self.path).st_mtime_ns
+        except Exception as e:
+            print("Error saving presets:", e)
+
+    def _schedule_save(self):
+        # Called with the lock held, so a reload never lands between a change
+        # and its dirty flag
+        self._changed_at = time.monotonic()
+        self._dirty.set()
+        self._wake.set()
+        if self._thread is None and not self._closed.is_set():
+            self.start()
+
+    def _run(self):
+        while not self._closed.is_set():
+            if self._dirty.is_set():
+                wait = self._changed_at + self.save_delay - time.monotonic()
+                if wait <= 0:
+                    self.flush()
+                    continue
+            else:
+                self._check_outside_edit()
+                wait = self.poll_interval
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def _check_outside_edit(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._mtime and not self._dirty.is_set():
+            self._load()
@@ -0,0 +1,140 @@
+import collections
+import threading
+
+import numpy as np
+
+from archive import Archive, ArchiveWriter
+
+# ===============================
+# Session Recorder
+# ===============================
+# The DSP stage copies each block into a preallocated ring of records; a
+# background thread appends whatever has accumulated to the session archive
+# (see archive.py). Nothing on the hot path touches the disk or the console.
+
+RING_CAPACITY = 1 << 16     # Records held in memory (~2 minutes at 500 Hz)
+FLUSH_INTERVAL = 1.0        # Seconds between background flushes
+
+
+def record_dtype(channels=2):
+    return np.dtype([
+        ("index", "<i8"),                   # Sample counter since start (gaps = overruns)
+        ("time", "<f8"),                    # Unix time the block arrived
+        ("raw", "<i4", (channels,)),
+        ("envelope", "<f4", (channels,)),
+        ("output", "i1"),                   # Action number, 0 = none
+    ])
+
+
+def load_recording(path):
+    """Open a recording written by SessionRecorder; columns are memory-mapped."""
+    return Archive(path)
+
+
+class SessionRecorder:
+    """Ring-buffered recorder of raw samples, envelopes and decisions."""
+
+    def __init__(self, path, channels=2, sample_rate=500, capacity=RING_CAPACITY, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.channels = channels
+        self.archive = ArchiveWriter(path, channels, sample_rate)
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.dtype = record_dtype(channels)
+        self.written = 0
+        self.overruns = 0
+        self._samples = 0
+        self._ring = np.zeros(capacity, dtype=self.dtype)
+        # Key events are rare; a deque is enough to hand them to the flusher
+        self._events = collections.deque()
+        # Single producer (DSP stage) advances _head, the flusher advances _tail
+        self._head = 0
+        self._tail = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.archive.open()
+        # Differs from the requested path if that one was already taken
+        self.path = self.archive.path
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._flush_loop, name="emg-recorder", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Flush everything still in the ring and close the file."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.archive.close()
+
+    def write(self, raw, env, outputs, timestamp, events=()):
+        """
+        Copy one block (and its (event, action, index) key events) into the
+        ring. Drops the block if the flusher fell behind.
+        """
+        n = len(raw)
+        index = self._samples
+        self._samples += n
+        for event, action, offset in events:
+            self._events.append((index + offset, event, action))
+        head = self._head
+        if head + n - self._tail > self.capacity:
+            self.overruns += n
+            self._wake.set()
+            return False
+        start = head % self.capacity
+        first = min(n, self.capacity - start)
+        self._fill(start, index, raw[:first], env[:first], outputs[:first], timestamp)
+        if first < n:
+            self._fill(0, index + first, raw[first:], env[first:], outputs[first:], timestamp)
+        self._head = head + n
+        if self._head - self._tail > self.capacity // 2:
+            self._wake.set()
+        return True
+
+    def _fill(self, pos, index, raw, env, outputs, timestamp):
+        rows = self._ring[pos:pos + len(raw)]
+        rows["index"] = np.arange(index, index + len(raw))
+        rows["time"] = timestamp
+        rows["raw"] = raw
+        rows["envelope"] = env
+        rows["output"] = outputs
+
+    def stats(self):
+        return {"written": self.written, "pending": self._head - self._tail, "overruns": self.overruns}
+
+    def _flush_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._flush()
+        self._flush()
+
+    def _flush(self):
+        head, tail = self._head, self._tail
+        events = [self._events.popleft() for _ in range(len(self._events))]
+        if head == tail and not events:
+            return
+        start = tail % self.capacity
+        end = start + (head - tail)
+        if end <= self.capacity:
+            rows = self._ring[start:end]
+        else:
+            rows = np.concatenate((self._ring[start:], self._ring[:end - self.capacity]))
+        try:
+            # Overruns leave gaps in the sample counter; the archive indexes each run
+            breaks = np.flatnonzero(np.diff(rows["index"]) != 1) + 1
+            for run in np.split(rows, breaks):
+                if len(run):
+                    self.archive.append(int(run["index"][0]), run["time"], run["raw"],
+                                        run["envelope"], run["output"])
+            self.archive.append_events(events)
+            self.archive.flush()
+        except OSError as e:
+            print("Error writing recording:", e)
+        self.written += head - tail
+        self._tail = head
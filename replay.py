@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from recorder import load_recording
+from serial_ingest import encode_frames, encode_lines
+
+# ===============================
+# Offline Replay Sources
+# ===============================
+# Feed recorded or synthetic two-channel EMG through the same envelope and
+# classification path as the live board, with no hardware attached.
+
+SAMPLE_RATE = 500           # Matches SAMPLE_RATE in Sketch.ino
+REPLAY_BLOCK = 32           # Samples per block handed to the pipeline
+MAX_PENDING = 65536         # Bytes PseudoSerial buffers before dropping
+
+
+def synthetic_emg(seconds=10.0, sample_rate=SAMPLE_RATE, bursts=None, noise=3.0, seed=0):
+    """
+    Generate an (N, 2) int array that looks like the board's envelope output:
+    a rectified noise floor plus contraction bursts.
+    bursts is a list of (start_s, duration_s, channel, amplitude). By default
+    it cycles through gestures for action1, action2 and action3.
+    """
+    n = int(seconds * sample_rate)
+    rng = np.random.default_rng(seed)
+    signal = np.abs(rng.normal(0.0, noise, size=(n, 2)))
+    if bursts is None:
+        gestures = [
+            [(0.0, 0.4, 0, 40)],                        # ch1 alone -> action1
+            [(0.0, 0.4, 1, 220)],                       # ch2 alone -> action2
+            [(0.0, 0.9, 1, 220), (0.1, 0.8, 0, 55)],    # ch2 then ch1 -> action3 (once
+                                                        # action2's cooldown expires)
+        ]
+        bursts = [
+            (t + 0.5 + offset, duration, channel, amplitude)
+            for i, t in enumerate(np.arange(0.0, seconds - 1.0, 1.5))
+            for offset, duration, channel, amplitude in gestures[i % 3]
+        ]
+    for start, duration, channel, amplitude in bursts:
+        lo = int(start * sample_rate)
+        hi = min(n, lo + int(duration * sample_rate))
+        if hi > lo:
+            signal[lo:hi, channel] += amplitude * (0.75 + 0.25 * np.abs(rng.normal(size=hi - lo)))
+    return np.rint(signal).astype(np.int64)
+
+
+def load_samples(path):
+    """
+    Raw samples from a recording (see recorder.py), memory-mapped so hours
+    of data are not read up front, or from a tab/space separated text capture.
+    """
+    if os.path.isdir(path):
+        return load_recording(path)["raw"]
+    return np.loadtxt(path, dtype=np.int64, ndmin=2)
+
+
+class ReplaySource:
+    """
+    Drop-in for LineReader/FrameDecoder that serves blocks from an array.
+    With sample_rate=None blocks are served as fast as they are read.
+    """
+
+    def __init__(self, samples, block_size=REPLAY_BLOCK, sample_rate=None, loop=False):
+        # Arrays are kept as given (e.g. an archive memmap); blocks are converted as they are served
+        self.samples = samples if isinstance(samples, np.ndarray) else np.asarray(samples, dtype=np.int64)
+        self.channels = self.samples.shape[1]
+        self.block_size = block_size
+        self.sample_rate = sample_rate
+        self.loop = loop
+        self.malformed = 0
+        self.dropped = 0
+        self.arrival_ns = 0
+        self.position = 0
+        self._started = None
+        self._empty = np.empty((0, self.channels), dtype=np.int64)
+
+    @property
+    def finished(self):
+        return not self.loop and self.position >= len(self.samples)
+
+    def read_block(self):
+        if self.finished:
+            # Behave like an idle port instead of spinning
+            time.sleep(0.05)
+            return self._empty
+        if self.loop and self.position >= len(self.samples):
+            self.position = 0
+            self._started = None
+        if self.sample_rate:
+            if self._started is None:
+                self._started = time.perf_counter() - self.position / self.sample_rate
+            due = self._started + (self.position + self.block_size) / self.sample_rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        block = np.asarray(self.samples[self.position:self.position + self.block_size], dtype=np.int64)
+        self.position += len(block)
+        self.arrival_ns = time.perf_counter_ns()
+        return block
+
+    def __iter__(self):
+        while not self.finished:
+            yield self.read_block()
+
+
+class PseudoSerial:
+    """
+    Plays samples into one end of a pty pair at the board's sample rate, so
+    serial.Serial(PseudoSerial.port) behaves like a real board (Linux/macOS).
+    """
+
+    def __init__(self, samples, sample_rate=SAMPLE_RATE, serial_format="ascii", loop=True):
+        self.samples = np.asarray(samples, dtype=np.int64)
+        self.sample_rate = sample_rate
+        self.serial_format = serial_format
+        self.loop = loop
+        self.port = None
+        self.sent = 0
+        self._master = None
+        self._slave = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        import tty
+
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        # Never block the player if nobody is reading the other end
+        os.set_blocking(self._master, False)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._play, name="pseudo-serial", daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+
+    def _encode(self, block, seq):
+        if self.serial_format == "binary":
+            return encode_frames(block, seq)
+        return encode_lines(block)
+
+    def _play(self):
+        started = time.perf_counter()
+        position = 0
+        pending = b""
+        while not self._stop.wait(0.01):
+            due = int((time.perf_counter() - started) * self.sample_rate)
+            while self.sent < due:
+                if position >= len(self.samples):
+                    if not self.loop:
+                        # Send what is left, then finish
+                        self._stop.set()
+                        break
+                    position = 0
+                block = self.samples[position:position + due - self.sent]
+                pending += self._encode(block, self.sent)
+                position += len(block)
+                self.sent += len(block)
+            try:
+                pending = pending[os.write(self._master, pending):]
+            except BlockingIOError:
+                pass
+            except OSError:
+                return
+            if len(pending) > MAX_PENDING:
+                # Like a real UART: bytes nobody reads are lost
+                pending = b""
@@ -0,0 +1,227 @@
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+# ===============================
+# Batched Serial Ingestion
+# ===============================
+# Instead of one readline() per sample, drain everything the OS has buffered,
+# parse all complete lines in one go and keep any trailing partial line for
+# the next call.
+
+MAX_READ = 65536            # Upper bound for a single read() call
+
+# Binary frame layout (see sendFrame() in Sketch.ino):
+#   sync (0xA5) | seq (uint8) | channels x int16 little-endian | checksum (uint8)
+# The checksum is the 8-bit sum of every byte between sync and checksum.
+SYNC_BYTE = 0xA5
+
+
+def frame_dtype(channels=2):
+    return np.dtype([
+        ("sync", "u1"),
+        ("seq", "u1"),
+        ("data", "<i2", (channels,)),
+        ("checksum", "u1"),
+    ])
+
+
+def encode_frames(samples, seq=0):
+    """Encode an (N, channels) int array as binary frames, like sendFrame() in Sketch.ino."""
+    samples = np.asarray(samples).reshape(len(samples), -1)
+    frames = np.zeros(len(samples), dtype=frame_dtype(samples.shape[1]))
+    frames["sync"] = SYNC_BYTE
+    frames["seq"] = (seq + np.arange(len(samples))) & 0xFF
+    frames["data"] = np.clip(samples, -32768, 32767)
+    raw = frames.view(np.uint8).reshape(len(samples), -1)
+    frames["checksum"] = raw[:, 1:-1].sum(axis=1, dtype=np.uint8)
+    return frames.tobytes()
+
+
+def encode_lines(samples):
+    """Encode an (N, channels) int array as tab-separated ASCII lines."""
+    return "".join("\t".join(map(str, row)) + "\r\n" for row in np.asarray(samples).tolist()).encode()
+
+
+class _PortReader(ABC):
+    """Shared port draining for the ASCII and binary readers; subclasses parse in feed()."""
+
+    def __init__(self, port, channels, max_read):
+        self.port = port
+        self.channels = channels
+        self.max_read = max_read
+        self.malformed = 0
+        self.dropped = 0
+        # perf_counter_ns() when the bytes of the last block came off the port
+        self.arrival_ns = 0
+        self._empty = np.empty((0, channels), dtype=np.int64)
+
+    def read_block(self):
+        """Read every available byte from the port and return the parsed block."""
+        # Block for at most the port timeout when nothing is waiting, so the
+        # caller never spins on an idle line.
+        data = self.port.read(min(self.port.in_waiting, self.max_read) or 1)
+        if not data:
+            return self._empty
+        waiting = self.port.in_waiting
+        if waiting:
+            data += self.port.read(min(waiting, self.max_read))
+        self.arrival_ns = time.perf_counter_ns()
+        return self.feed(data)
+
+    @abstractmethod
+    def feed(self, data):
+        """Parse raw bytes and return every complete sample as an (N, channels) int array."""
+
+
+class LineReader(_PortReader):
+    """Parses tab-separated ASCII samples ("ch1\\tch2\\n") into (N, channels) int blocks."""
+
+    def __init__(self, port=None, channels=2, max_read=MAX_READ, skip_partial=True):
+        super().__init__(port, channels, max_read)
+        self._pending = b""
+        # The board may already be mid-line when the port opens
+        self._synced = not skip_partial
+
+    def feed(self, data):
+        """Append raw bytes and return every complete sample as an int array."""
+        buf = self._pending + data
+        end = buf.rfind(b"\n")
+        if end < 0:
+            self._pending = buf
+            return self._empty
+        complete, self._pending = buf[:end], buf[end + 1:]
+        if not self._synced:
+            self._synced = True
+            start = complete.find(b"\n")
+            if start < 0:
+                return self._empty
+            complete = complete[start + 1:]
+        return self._parse(complete)
+
+    def _parse(self, complete):
+        if not complete:
+            return self._empty
+        # Fast path: every line has exactly `channels` tab-separated fields of
+        # one integer each. Checked per field over the raw bytes, since totals
+        # for the whole block can balance out across lines ("1\t2\t3\n4")
+        buf = np.frombuffer(complete, dtype=np.uint8)
+        seps = np.flatnonzero((buf == 9) | (buf == 10))     # \t and \n
+        fields = len(seps) + 1
+        if fields % self.channels == 0:
+            word = buf > 32                                 # Not ASCII whitespace
+            starts = np.flatnonzero(word[1:] > word[:-1]) + 1
+            if word[0]:
+                starts = np.concatenate(([0], starts))
+            # One token in each field, and a newline after every `channels` fields
+            if (np.array_equal(np.searchsorted(seps, starts), np.arange(fields))
+                    and np.array_equal(np.flatnonzero(buf[seps] == 10),
+                                       np.arange(self.channels - 1, len(seps), self.channels))):
+                try:
+                    return np.array(complete.split()).astype(np.int64).reshape(-1, self.channels)
+                except ValueError:
+                    pass
+        return self._parse_slow(complete)
+
+    def _parse_slow(self, complete):
+        """Line-by-line parse that drops and counts malformed lines."""
+        rows = []
+        for line in complete.split(b"\n"):
+            line = line.strip()
+            if not line:
+                continue
+            parts = line.split(b"\t")
+            if len(parts) != self.channels:
+                self.malformed += 1
+                continue
+            try:
+                rows.append([int(p) for p in parts])
+            except ValueError:
+                self.malformed += 1
+        if not rows:
+            return self._empty
+        return np.array(rows, dtype=np.int64)
+
+
+class FrameDecoder(_PortReader):
+    """
+    Decodes fixed-size binary frames into (N, channels) int blocks.
+    Frames are viewed in place with np.frombuffer over a bytearray ring;
+    gaps in the sequence number are counted in `dropped`, and every resync
+    after a corrupt or misaligned frame once in `malformed`.
+    """
+
+    def __init__(self, port=None, channels=2, max_read=MAX_READ):
+        super().__init__(port, channels, max_read)
+        self.frame_size = 3 + 2 * channels
+        self.dtype = frame_dtype(channels)
+        self._last_seq = None
+        self._resyncing = False     # Skipping bytes until the next valid frame
+        self._ring = bytearray(2 * max_read + self.frame_size)
+        self._length = 0
+
+    def feed(self, data):
+        """Append raw bytes and return every complete, valid frame as an int array."""
+        end = self._length + len(data)
+        if end > len(self._ring):
+            # Only happens if the caller feeds more than max_read at once
+            self._ring = self._ring[:self._length] + bytearray(max(end, 2 * len(self._ring)) - self._length)
+        self._ring[self._length:end] = data
+        self._length = end
+
+        blocks = []
+        pos = 0
+        size = self.frame_size
+        while True:
+            # Align on the next sync byte
+            pos = self._ring.find(SYNC_BYTE, pos, self._length)
+            if pos < 0:
+                pos = self._length
+                break
+            count = (self._length - pos) // size
+            if count == 0:
+                break
+            raw = np.frombuffer(self._ring, dtype=np.uint8, count=count * size, offset=pos).reshape(count, size)
+            valid = (raw[:, 0] == SYNC_BYTE) & (raw[:, 1:-1].sum(axis=1, dtype=np.uint8) == raw[:, -1])
+            good = count if valid.all() else int(np.argmin(valid))
+            if good:
+                frames = np.frombuffer(self._ring, dtype=self.dtype, count=good, offset=pos)
+                blocks.append(frames["data"].astype(np.int64))
+                self._count_gaps(frames["seq"])
+                pos += good * size
+                self._resyncing = False
+            if good < count:
+                # Corrupt or misaligned frame: skip a byte and resync,
+                # counting the bad frame once however many bytes it takes
+                if not self._resyncing:
+                    self.malformed += 1
+                    self._resyncing = True
+                pos += 1
+            else:
+                break
+
+        # Keep the incomplete tail at the start of the ring
+        remaining = self._length - pos
+        self._ring[:remaining] = self._ring[pos:self._length]
+        self._length = remaining
+
+        if not blocks:
+            return self._empty
+        return blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+
+    def _count_gaps(self, seq):
+        seq = seq.astype(np.int64)
+        if self._last_seq is not None:
+            seq = np.concatenate(([self._last_seq], seq))
+        self.dropped += int(((np.diff(seq) - 1) % 256).sum())
+        self._last_seq = int(seq[-1])
+
+
+def make_reader(port, serial_format="ascii", channels=2):
+    """Return the reader matching the board's output format ("ascii" or "binary")."""
+    if serial_format == "binary":
+        return FrameDecoder(port, channels=channels)
+    if serial_format == "ascii":
+        return LineReader(port, channels=channels)
+    raise ValueError(f"Unknown serial format: {serial_format}")
@@ -0,0 +1,316 @@
+import os
+import re
+import threading
+import time
+
+import numpy as np
+import serial
+
+from calibration import Calibrator
+from classifier import ThresholdClassifier
+from envelope import EnvelopeTracker
+from gestures import GestureStateMachine
+from metrics import PipelineMetrics
+from pipeline import DROP_OLDEST, Pipeline
+from recorder import SessionRecorder
+from serial_ingest import make_reader
+from streaming import LiveStream
+
+# ===============================
+# Device Sessions
+# ===============================
+# Everything that belongs to one board - its serial port, envelopes,
+# classifier, gesture state, key map, metrics, recorder and scope - lives in a
+# Session, so several boards (users, limbs) can run side by side in one
+# process. Each running session owns its own reader/DSP/actuator threads,
+# or shares one asyncio loop for reading (see async_serial.py).
+
+DEFAULT_KEYS = {"action1": "space", "action2": "left", "action3": "right"}
+
+
+class Session:
+    """One EMG board: port, processing state and its pipeline."""
+
+    def __init__(self, port, actuator, baud_rate=115200, serial_format="ascii", channels=2,
+                 action_keys=None, classifier=None, window=64, bandpass=None, gestures=None,
+                 queue_size=256, drop_policy=DROP_OLDEST, sample_rate=500, record_dir=None,
+                 summary_interval=1.0, hub=None, normalizer=None):
+        self.port = port
+        # actuators.Dispatcher that key events go out through
+        self.actuator = actuator
+        self.baud_rate = baud_rate
+        self.serial_format = serial_format
+        self.channels = channels
+        self.action_keys = dict(action_keys or DEFAULT_KEYS)
+        self.classifier = classifier or ThresholdClassifier()
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.record_dir = record_dir
+        self.sample_rate = sample_rate
+        self.summary_interval = summary_interval
+        # AsyncSerialHub to read on its event loop instead of a reader thread
+        self.hub = hub
+
+        # Running-sum envelope (O(1) per sample)
+        self.envelopes = EnvelopeTracker(channels=channels, window=window)
+        # Boards streaming raw ADC (RAW_STREAM) are band-passed and enveloped
+        # here the way Sketch.ino would before the usual processing
+        self.bandpass = bandpass
+        self.board_envelopes = EnvelopeTracker(channels=channels, window=window)
+        # AdaptiveNormalizer to correct baseline drift and gain before classifying
+        self.normalizer = normalizer
+        self.live_stream = LiveStream(channels=channels, sample_rate=sample_rate)
+        self.calibrator = Calibrator(channels=channels)
+        # Per-action hysteresis, refractory and tap/hold (see gestures.py)
+        self.gestures = GestureStateMachine(gestures, sample_rate=sample_rate)
+        self.metrics = PipelineMetrics()
+        self.recorder = None
+        self.pipeline = None
+        self.ser = None
+        self.last_summary_time = 0
+        self.summary = {}
+        self.reset()
+
+    @property
+    def running(self):
+        return self.pipeline is not None
+
+    def reset(self):
+        """Clear envelope, gesture, metrics and summary state before a new run."""
+        self.envelopes.reset()
+        self.classifier.reset()
+        self.live_stream.reset()
+        if self.bandpass:
+            self.bandpass.reset()
+        self.board_envelopes.reset()
+        self.actuator.reset()
+        if self.normalizer:
+            self.normalizer.reset()
+        self.gestures.reset()
+        self.metrics.reset()
+        self.reset_summary()
+
+    def reset_summary(self):
+        self.summary["samples"] = 0
+        self.summary["peak"] = np.zeros(self.channels)
+        self.summary["outputs"] = np.zeros(4, dtype=np.int64)
+
+    # -------- Lifecycle --------
+
+    def start(self):
+        """
+        Open the port and start the pipeline. Raises serial.SerialException,
+        ValueError if the actuator backend cannot send a mapped key, or
+        RuntimeError if the backend cannot be opened or the classifier's
+        worker processes do not start.
+        """
+        # Also opens the backend (uinput device, keyboard hook)
+        self.actuator.check_keys(self.action_keys.values())
+        try:
+            if hasattr(self.classifier, "start"):
+                # Worker processes for an offloaded model (offload.RemoteClassifier)
+                self.classifier.start()
+            self.ser = serial.Serial(self.port, self.baud_rate, timeout=1)
+        except Exception:
+            if hasattr(self.classifier, "close"):
+                self.classifier.close()
+            self.actuator.close()
+            raise
+        reader = make_reader(self.ser, self.serial_format, channels=self.channels)
+        self.reset()
+        if self.record_dir:
+            name = time.strftime("session-%Y%m%d-%H%M%S", time.localtime())
+            if self.port_label:
+                name += "-" + self.port_label
+            self.recorder = SessionRecorder(os.path.join(self.record_dir, name), channels=self.channels,
+                                            sample_rate=self.sample_rate)
+            self.recorder.start()
+        self.pipeline = Pipeline(reader, self.process_block, self.trigger_actions,
+                                 maxsize=self.queue_size, policy=self.drop_policy, metrics=self.metrics)
+        if self.hub is None:
+            self.pipeline.start()
+            return
+        self.pipeline.start(read=False)
+        try:
+            self.hub.run(self.hub.attach(self.ser, reader, self.pipeline))
+        except Exception:
+            self.stop()
+            raise
+
+    def stop(self):
+        if self.hub and self.ser:
+            # Cancelling the stream task stops reading immediately
+            self.hub.run(self.hub.detach(self.ser))
+        elif self.ser:
+            # Clear the running flag first: on Windows cancel_read only aborts
+            # a read already in progress, so a reader between reads must see
+            # the flag rather than block for the port timeout
+            if self.pipeline:
+                self.pipeline.halt()
+            # Wake a reader blocked in read() so the pipeline stops right away
+            self.ser.cancel_read()
+        if self.pipeline:
+            self.pipeline.stop()
+            self.pipeline = None
+            # Let go of any key still held down
+            now = time.time()
+            try:
+                self.trigger_actions([(event, action, now) for event, action, _ in self.gestures.release_all()])
+            except Exception as e:
+                print("actions stage error:", e)
+            self.actuator.close()
+        if self.recorder:
+            self.recorder.stop()
+            self.recorder = None
+        if hasattr(self.classifier, "close"):
+            self.classifier.close()
+        if self.ser:
+            self.ser.close()
+            self.ser = None
+
+    @property
+    def port_label(self):
+        """Port name usable in a file name ("/dev/ttyUSB0" -> "ttyUSB0")."""
+        return re.sub(r"[^A-Za-z0-9_.-]", "", os.path.basename(self.port))
+
+    # -------- Pipeline stages --------
+
+    def process_block(self, block, current_time=None):
+        """
+        DSP/classifier stage: computes envelopes and decisions for a block of samples.
+        current_time defaults to now; replay passes the sample clock instead.
+        Returns (actions to trigger, text to log); actions are (event, action,
+        time of the sample that triggered it).
+        """
+        if current_time is None:
+            current_time = time.time()
+        metrics = self.metrics
+        start = time.perf_counter_ns()
+        # Recordings keep the samples as the board sent them (raw ADC with
+        # HOST_FILTER), so replaying one filters and normalizes afresh
+        raw = block
+        signal = None
+        if self.bandpass:
+            signal = self.bandpass.process_block(block)
+            block = np.rint(self.board_envelopes.process_block(np.abs(signal))).astype(np.int64)
+        if self.normalizer:
+            block = np.rint(self.normalizer.process_block(block)).astype(np.int64)
+        env = self.envelopes.process_block(np.abs(block))
+        enveloped = time.perf_counter_ns()
+        # Trained models see the band-passed EMG when there is one; the
+        # threshold rules are written for the board envelope
+        if signal is None or getattr(self.classifier, "input", "envelope") != "signal":
+            signal = block
+        outputs = self.classifier.classify(signal, env)
+        self.calibrator.update(block, env)
+        self.live_stream.push(block, env, outputs)
+        metrics.envelope.record(enveloped - start)
+        metrics.classify.record(time.perf_counter_ns() - enveloped)
+
+        # Key events for gestures that started or ended in this block.
+        # Nothing new starts while calibrating.
+        actions = self.gestures.process_block(outputs, enabled=self.calibrator.phase is None)
+
+        if self.recorder:
+            self.recorder.write(raw, env, outputs, current_time, actions)
+        last = len(block) - 1
+        actions = [(event, action, current_time - (last - index) / self.sample_rate)
+                   for event, action, index in actions]
+        return actions, self.summarize_block(block, env, outputs, current_time)
+
+    def summarize_block(self, block, env, outputs, current_time):
+        """Accumulate per-block stats and return a one-line console summary every summary_interval."""
+        summary = self.summary
+        summary["samples"] += len(block)
+        summary["peak"] = np.maximum(summary["peak"], env.max(axis=0))
+        counts = np.bincount(outputs, minlength=len(summary["outputs"]))
+        if len(counts) > len(summary["outputs"]):
+            summary["outputs"] = np.pad(summary["outputs"], (0, len(counts) - len(summary["outputs"])))
+        summary["outputs"] += counts
+        if current_time - self.last_summary_time < self.summary_interval:
+            return None
+        self.last_summary_time = current_time
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(current_time))
+        raw1, raw2 = block[-1].tolist()[:2]
+        envelope1, envelope2 = env[-1].tolist()[:2]
+        peak1, peak2 = summary["peak"].tolist()[:2]
+        counts = summary["outputs"][1:].tolist()
+        text = (f"{timestamp} | {self.port} | Samples: {summary['samples']} | Raw: {raw1}, {raw2} | "
+                f"Envelope: {envelope1:.2f}, {envelope2:.2f} (peak {peak1:.2f}, {peak2:.2f}) | "
+                f"Outputs {'/'.join(str(i + 1) for i in range(len(counts)))}: {'/'.join(map(str, counts))}")
+        self.reset_summary()
+        return text
+
+    def trigger_actions(self, events):
+        """Actuator stage: send a batch of (event, action, time) as key events."""
+        self.actuator.dispatch([(event, self.action_keys[action], action, t) for event, action, t in events])
+
+    # -------- Status --------
+
+    def get_metrics(self):
+        """Latency percentiles, throughput and drop counters for this session."""
+        result = self.metrics.snapshot()
+        # stop() may clear these from another thread meanwhile
+        pipeline, recorder = self.pipeline, self.recorder
+        if pipeline:
+            reader = pipeline.reader
+            result["malformed_lines"] = reader.malformed
+            result["dropped_frames"] = reader.dropped
+            result["queues"] = pipeline.stats()
+        if recorder:
+            result["recorder"] = recorder.stats()
+        if hasattr(self.classifier, "stats"):
+            result["offload"] = self.classifier.stats()
+        result["actuator"] = self.actuator.stats()
+        if self.normalizer:
+            result["normalization"] = self.normalizer.state()
+        return result
+
+    def info(self):
+        return {"port": self.port, "running": self.running, "keys": dict(self.action_keys),
+                "calibrating": self.calibrator.phase}
+
+
+class SessionManager:
+    """Sessions by port name; each running session has its own pipeline threads."""
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self, port):
+        with self._lock:
+            return self._sessions.get(port)
+
+    def sessions(self):
+        with self._lock:
+            return list(self._sessions.values())
+
+    def start(self, session):
+        """
+        Start a session, replacing a stopped one on the same port.
+        Raises RuntimeError if that port is already running.
+        """
+        with self._lock:
+            current = self._sessions.get(session.port)
+            if current and current.running:
+                raise RuntimeError(f"{session.port} is already running")
+            self._sessions[session.port] = session
+        session.start()
+
+    def stop(self, port):
+        session = self.get(port)
+        if session:
+            session.stop()
+        return session
+
+    def stop_all(self):
+        # Stop concurrently so N boards take one pipeline timeout, not N
+        threads = [threading.Thread(target=session.stop) for session in self.sessions() if session.running]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def info(self):
+        return [session.info() for session in self.sessions()]
@@ -0,0 +1,69 @@
+import base64
+
+import numpy as np
+
+# ===============================
+# Live Signal Stream for the UI
+# ===============================
+# The DSP stage decimates every block to a few scope frames per second and
+# appends them to a ring; the page pulls everything since its cursor.
+# Frames travel as base64 packed Float32 so one bridge call carries a whole
+# batch, and the acquisition thread never waits on the UI.
+
+SCOPE_RATE = 30             # Frames per second sent to the UI
+STREAM_CAPACITY = 4096      # Frames kept for slow readers (~2 minutes)
+
+
+class LiveStream:
+    """
+    Peak-hold decimated frames of [envelopes..., raw..., decision].
+    Single writer (DSP stage); any number of cursor-based readers.
+    """
+
+    def __init__(self, channels=2, sample_rate=500, rate=SCOPE_RATE, capacity=STREAM_CAPACITY):
+        self.channels = channels
+        self.decimation = max(1, round(sample_rate / rate))
+        self.width = 2 * channels + 1
+        self.capacity = capacity
+        self.reset()
+
+    def reset(self):
+        self._frames = np.zeros((self.capacity, self.width), dtype=np.float32)
+        self._pending = np.empty((0, self.width), dtype=np.float32)
+        self.head = 0
+
+    def push(self, raw, env, outputs):
+        """Add a block; emits one frame per `decimation` samples."""
+        rows = np.concatenate((env, raw, outputs[:, None]), axis=1).astype(np.float32)
+        pending = np.concatenate((self._pending, rows)) if len(self._pending) else rows
+        count = len(pending) // self.decimation
+        self._pending = pending[count * self.decimation:]
+        if count == 0:
+            return
+        frames = pending[:count * self.decimation].reshape(count, self.decimation, self.width).max(axis=1)
+        frames = frames[-self.capacity:]
+        start = (self.head + count - len(frames)) % self.capacity
+        first = min(len(frames), self.capacity - start)
+        self._frames[start:start + first] = frames[:first]
+        self._frames[:len(frames) - first] = frames[first:]
+        self.head += count
+
+    def read(self, cursor=0):
+        """
+        Everything since `cursor` as {"cursor", "count", "width", "data"} where
+        data is base64 little-endian Float32, `width` values per frame.
+        """
+        head = self.head
+        cursor = min(max(int(cursor), head - self.capacity, 0), head)
+        count = head - cursor
+        start = cursor % self.capacity
+        if start + count <= self.capacity:
+            frames = self._frames[start:start + count]
+        else:
+            frames = np.concatenate((self._frames[start:], self._frames[:start + count - self.capacity]))
+        return {
+            "cursor": head,
+            "count": count,
+            "width": self.width,
+            "data": base64.b64encode(frames.astype("<f4").tobytes()).decode("ascii"),
+        }
@@ -0,0 +1,70 @@
+"""Archive: time lookups and block iteration across chunk and gap index entries."""
+import numpy as np
+
+from archive import Archive, ArchiveWriter
+
+RATE = 8                    # Sample times are exact in binary
+START = 100.0
+
+
+def write_with_gap(path):
+    """Samples 0-69, then 30 lost, then 100-129; returns their times."""
+    writer = ArchiveWriter(str(path), channels=2, sample_rate=RATE, chunk=50)
+    writer.open()
+    times = []
+    for sample, n in ((0, 30), (30, 40), (100, 30)):
+        counter = np.arange(sample, sample + n)
+        t = START + counter / RATE
+        position = writer.position + np.arange(n)
+        raw = np.column_stack((position, -position))
+        writer.append(sample, t, raw, raw * 0.5, position % 4)
+        times.append(t)
+    writer.close()
+    return Archive(writer.path), np.concatenate(times)
+
+
+def test_index_and_times(tmp_path):
+    archive, times = write_with_gap(tmp_path / "run")
+    assert len(archive) == 100
+    # Start, chunk boundary, gap
+    assert archive.index["position"].tolist() == [0, 50, 70]
+    assert np.array_equal(archive.times(), times)
+    assert archive.start_time == START
+    assert archive.end_time == START + 129 / RATE
+
+
+def test_position_across_the_gap(tmp_path):
+    archive, _ = write_with_gap(tmp_path / "run")
+    assert archive.position(START + 35 / RATE) == 35
+    assert archive.position(START + 35.5 / RATE) == 36
+    # Inside the gap: the first sample after it
+    assert archive.position(START + 85 / RATE) == 70
+    assert archive.position(START + 104 / RATE) == 74
+    assert archive.position(START - 1) == 0
+    assert archive.position(START + 1000) == 100
+
+
+def test_between_spans_the_gap(tmp_path):
+    archive, times = write_with_gap(tmp_path / "run")
+    columns = archive.between(START + 64 / RATE, START + 104 / RATE)
+    assert columns["raw"][:, 0].tolist() == list(range(64, 74))
+    assert np.array_equal(columns["envelope"], archive["raw"][64:74] * 0.5)
+    assert np.array_equal(archive.times(64, 74), times[64:74])
+
+
+def test_iter_blocks(tmp_path):
+    archive, _ = write_with_gap(tmp_path / "run")
+    blocks = list(archive.iter_blocks(block_size=16))
+    assert [len(b["raw"]) for b in blocks] == [16] * 6 + [4]
+    assert np.array_equal(np.concatenate([b["raw"] for b in blocks]), archive["raw"])
+    assert np.array_equal(np.concatenate([b["output"] for b in blocks]), np.arange(100) % 4)
+    part = list(archive.iter_blocks(block_size=16, start=60, stop=500, columns=("raw",)))
+    assert [list(b) for b in part] == [["raw"]] * 3
+    assert np.concatenate([b["raw"] for b in part])[:, 0].tolist() == list(range(60, 100))
+
+
+def test_never_appends_to_an_existing_run(tmp_path):
+    first, _ = write_with_gap(tmp_path / "run")
+    second, _ = write_with_gap(tmp_path / "run")
+    assert second.path == str(tmp_path / "run-2")
+    assert len(first) == len(second) == 100
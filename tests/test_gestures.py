@@ -0,0 +1,51 @@
+"""Gesture output must not depend on how samples are split into blocks."""
+import numpy as np
+import pytest
+
+from gestures import GestureStateMachine
+from replay import synthetic_emg
+from test_replay import replay
+
+GESTURES = {
+    "action1": {"mode": "tap", "onset": 0.01, "offset": 0.05, "refractory": 0.5},
+    "action2": {"mode": "hold", "onset": 0.0, "offset": 0.03, "refractory": 0.313},
+    "action3": {"mode": "tap", "onset": 0.02, "offset": 0.011, "refractory": 0.1},
+}
+
+
+def run(outputs, block_size):
+    machine = GestureStateMachine(GESTURES, sample_rate=500)
+    events = []
+    for start in range(0, len(outputs), block_size):
+        events += [(event, action, start + index)
+                   for event, action, index in machine.process_block(outputs[start:start + block_size])]
+    return events
+
+
+@pytest.mark.parametrize("block_size", [7, 32, 1000])
+def test_state_machine_block_size(block_size):
+    rng = np.random.default_rng(3)
+    outputs = np.repeat(rng.integers(0, 4, 4000), rng.integers(1, 40, 4000))
+    reference = run(outputs, 1)
+    assert len(reference) > 100
+    assert run(outputs, block_size) == reference
+
+
+def test_hold_presses_and_releases():
+    outputs = np.zeros(1000, dtype=np.int64)
+    outputs[100:300] = 2
+    assert run(outputs, 64) == [("press", "action2", 100), ("release", "action2", 314)]
+
+
+def test_refractory_blocks_retrigger():
+    outputs = np.zeros(1000, dtype=np.int64)
+    outputs[100:110] = 1
+    outputs[200:210] = 1     # Within 0.5 s of the first tap ending
+    outputs[500:510] = 1
+    assert [index for _, _, index in run(outputs, 16)] == [104, 504]
+
+
+@pytest.mark.parametrize("block_size", [7, 32, 500])
+def test_session_block_size(block_size):
+    samples = synthetic_emg(10)
+    assert replay(samples, block_size) == replay(samples, 1)
@@ -0,0 +1,58 @@
+"""Pipeline channels: each drop policy under a full queue."""
+import threading
+
+import pytest
+
+from pipeline import BLOCK, DROP_NEWEST, DROP_OLDEST, Channel
+
+
+def fill(channel, count):
+    return [channel.put(n) for n in range(count)]
+
+
+def test_drop_oldest_keeps_the_newest_items():
+    channel = Channel("test", maxsize=3, policy=DROP_OLDEST)
+    assert fill(channel, 5) == [True] * 5
+    assert channel.get_many(10) == [2, 3, 4]
+    assert channel.stats() == {"depth": 0, "high_water": 3, "put": 5, "dropped": 2}
+
+
+def test_drop_newest_refuses_items_when_full():
+    channel = Channel("test", maxsize=3, policy=DROP_NEWEST)
+    assert fill(channel, 5) == [True, True, True, False, False]
+    assert channel.get_many(10) == [0, 1, 2]
+    assert channel.dropped == 2
+    # Taking items frees their slots again
+    assert channel.put(5)
+    assert channel.get() == 5
+
+
+def test_block_waits_for_room():
+    channel = Channel("test", maxsize=2, policy=BLOCK)
+    fill(channel, 2)
+    producer = threading.Thread(target=channel.put, args=(2,))
+    producer.start()
+    producer.join(0.1)
+    assert producer.is_alive()
+    assert channel.get() == 0
+    producer.join(1.0)
+    assert not producer.is_alive()
+    assert channel.get_many(10) == [1, 2]
+    assert channel.dropped == 0
+
+
+def test_close_drains_then_ends():
+    channel = Channel("test", maxsize=4)
+    fill(channel, 3)
+    channel.close()
+    assert channel.get_many(2) == [0, 1]
+    assert channel.get_many(10) == [2]
+    with pytest.raises(EOFError):
+        channel.get_many(10)
+    with pytest.raises(EOFError):
+        channel.get()
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        Channel("test", policy="drop_random")
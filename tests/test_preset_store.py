@@ -0,0 +1,66 @@
+"""Preset store: debounced write-behind and reloading outside edits."""
+import json
+import os
+import time
+
+from preset_store import PresetStore
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def read(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def edit_by_hand(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+    # Make sure the mtime moves even on coarse filesystem clocks
+    mtime = os.stat(path).st_mtime_ns + 10**9
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_writes_behind_in_one_save(tmp_path):
+    path = str(tmp_path / "presets.json")
+    store = PresetStore(path, save_delay=0.2, poll_interval=0.05)
+    for n in range(5):
+        store.put_preset({"name": f"p{n}", "key1": "space"})
+    # Served from memory right away, written only after the delay
+    assert store.get_preset("p4")["key1"] == "space"
+    assert not os.path.exists(path)
+    wait_for(lambda: os.path.exists(path))
+    assert [p["name"] for p in read(path)["presets"]] == [f"p{n}" for n in range(5)]
+    store.close()
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_reloads_outside_edits(tmp_path):
+    path = str(tmp_path / "presets.json")
+    edit_by_hand(path, {"presets": [{"name": "old"}]})
+    store = PresetStore(path, poll_interval=0.05)
+    store.start()
+    edit_by_hand(path, {"presets": [{"name": "new"}], "active_profile": "me"})
+    wait_for(lambda: store.get_preset("new") is not None)
+    assert store.get_preset("old") is None
+    assert store.active_profile == "me"
+    store.close()
+
+
+def test_pending_changes_survive_an_outside_edit(tmp_path):
+    path = str(tmp_path / "presets.json")
+    edit_by_hand(path, {"presets": []})
+    store = PresetStore(path, save_delay=60.0)
+    store.put_profile({"name": "me", "thresholds": [1, 2, 3]})
+    edit_by_hand(path, {"presets": [{"name": "by hand"}]})
+    # A reload already past its dirty check when the change came in must not
+    # replace it before it is written
+    store._load()
+    assert store.get_profile("me") is not None
+    store.close()
+    assert [p["name"] for p in read(path)["profiles"]] == ["me"]
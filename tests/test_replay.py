@@ -0,0 +1,58 @@
+"""Classification regression tests: synthetic EMG replayed through Session.process_block."""
+from collections import Counter
+
+import numpy as np
+
+from actuators import make_dispatcher
+from normalize import AdaptiveNormalizer
+from replay import ReplaySource, synthetic_emg
+from session import Session
+
+SAMPLE_RATE = 500
+
+
+def replay(samples, block_size=32, normalizer=None):
+    """Key events as (event, action, sample number) for a replayed recording."""
+    session = Session("replay", make_dispatcher("memory"), sample_rate=SAMPLE_RATE, normalizer=normalizer)
+    source = ReplaySource(samples, block_size=block_size)
+    events = []
+    for block in source:
+        actions, _ = session.process_block(block, source.position / SAMPLE_RATE)
+        events += [(event, action, round(t * SAMPLE_RATE)) for event, action, t in actions]
+    return events
+
+
+def counts(events):
+    return Counter(action for _, action, _ in events)
+
+
+def test_decision_counts():
+    # Each 1.5 s gesture cycle: action1, action2, then action2 followed by
+    # action3 (channel 2 rises before channel 1 joins in)
+    events = replay(synthetic_emg(60))
+    assert counts(events) == {"action1": 14, "action2": 26, "action3": 13}
+    assert {event for event, _, _ in events} == {"tap"}
+
+
+def test_silence_triggers_nothing():
+    assert replay(synthetic_emg(10, bursts=[])) == []
+
+
+def test_normalizer_keeps_stationary_decisions():
+    samples = synthetic_emg(60)
+    assert counts(replay(samples, normalizer=AdaptiveNormalizer(sample_rate=SAMPLE_RATE))) == counts(replay(samples))
+
+
+def test_normalizer_corrects_drift():
+    seconds = 300
+    samples = synthetic_emg(seconds)
+    ramp = np.linspace(0.0, 1.0, len(samples))[:, None]
+    drifted = np.rint(samples * (1.0 - 0.4 * ramp) + 30 * ramp).astype(np.int64)
+    late = seconds * SAMPLE_RATE * 2 // 3
+
+    def late_counts(events):
+        return counts(event for event in events if event[2] > late)
+
+    expected = late_counts(replay(samples))
+    assert late_counts(replay(drifted)) != expected
+    assert late_counts(replay(drifted, normalizer=AdaptiveNormalizer(sample_rate=SAMPLE_RATE))) == expected
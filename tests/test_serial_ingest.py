@@ -0,0 +1,80 @@
+"""Serial parsing: partial lines, binary frame resync and gap counting."""
+import numpy as np
+
+from serial_ingest import FrameDecoder, LineReader, encode_frames, encode_lines
+
+SAMPLES = np.arange(200).reshape(100, 2)
+
+
+def feed_in_chunks(reader, data, size):
+    blocks = [reader.feed(data[i:i + size]) for i in range(0, len(data), size)]
+    return np.concatenate(blocks)
+
+
+def test_line_reader_carries_partial_lines():
+    data = encode_lines(SAMPLES)
+    for size in (1, 3, 7, 64, len(data)):
+        reader = LineReader(skip_partial=False)
+        assert np.array_equal(feed_in_chunks(reader, data, size), SAMPLES)
+        assert reader.malformed == 0
+
+
+def test_line_reader_skips_first_partial_line():
+    data = encode_lines(SAMPLES)
+    reader = LineReader()
+    # Opened mid-line ("3\r\n4\t5..."): the partial line is dropped, not counted
+    out = feed_in_chunks(reader, data[7:], 10)
+    assert np.array_equal(out, SAMPLES[2:])
+    assert reader.malformed == 0
+
+
+def test_line_reader_counts_malformed_lines():
+    reader = LineReader(skip_partial=False)
+    out = reader.feed(b"1\t2\r\n3\t\r\nx\t4\r\n5\t6\r\n")
+    assert np.array_equal(out, [[1, 2], [5, 6]])
+    assert reader.malformed == 2
+
+
+def test_line_reader_checks_fields_per_line():
+    # Three fields then one: the totals match two good lines, the lines do not
+    reader = LineReader(skip_partial=False)
+    assert len(reader.feed(b"1\t2\t3\r\n4\r\n")) == 0
+    assert reader.malformed == 2
+    for data in (b"1 2\t3\r\n4\t5\r\n", b"1\t2 3\r\n\t4\r\n", b"1\t2\r\n\r\n3\t4\r\n"):
+        fast, slow = LineReader(skip_partial=False), LineReader(skip_partial=False)
+        assert np.array_equal(fast.feed(data), slow._parse_slow(data[:-1]))
+        assert fast.malformed == slow.malformed
+
+
+def test_frame_decoder_in_chunks():
+    data = encode_frames(SAMPLES)
+    for size in (1, 5, 7, 100, len(data)):
+        decoder = FrameDecoder()
+        assert np.array_equal(feed_in_chunks(decoder, data, size), SAMPLES)
+        assert decoder.malformed == decoder.dropped == 0
+
+
+def test_frame_decoder_resyncs_after_corruption():
+    size = FrameDecoder().frame_size
+    data = bytearray(encode_frames(SAMPLES))
+    data[10 * size + 2] ^= 0xFF     # Bad checksum
+    data[40 * size + 3] ^= 0x0F
+    decoder = FrameDecoder()
+    out = feed_in_chunks(decoder, bytes(data), 9)
+    assert np.array_equal(out, np.delete(SAMPLES, [10, 40], axis=0))
+    # One per bad frame, not per byte skipped while resyncing
+    assert decoder.malformed == 2
+    # The lost frames also leave gaps in the sequence numbers
+    assert decoder.dropped == 2
+
+
+def test_frame_decoder_counts_gaps():
+    size = FrameDecoder().frame_size
+    data = encode_frames(SAMPLES)
+    # Frames 20-22 never arrive; sequence numbers wrap past 255 as well
+    data = data[:20 * size] + data[23 * size:] + encode_frames(SAMPLES, seq=100 + 250)
+    decoder = FrameDecoder()
+    out = feed_in_chunks(decoder, data, 50)
+    assert len(out) == 97 + 100
+    assert decoder.dropped == 3 + 250
+    assert decoder.malformed == 0
@@ -0,0 +1,48 @@
+"""Live stream: cursor reads across the ring wrap and for readers left behind."""
+import base64
+
+import numpy as np
+
+from streaming import LiveStream
+
+
+def push(stream, values):
+    values = np.asarray(values, dtype=np.float64)
+    stream.push(values[:, None] + 1000, values[:, None], np.zeros(len(values), dtype=np.int64))
+
+
+def envelopes(result):
+    frames = np.frombuffer(base64.b64decode(result["data"]), dtype="<f4").reshape(-1, result["width"])
+    assert len(frames) == result["count"]
+    return frames[:, 0].tolist()
+
+
+def test_read_across_the_wrap():
+    stream = LiveStream(channels=1, sample_rate=30, rate=30, capacity=8)
+    push(stream, range(5))
+    first = stream.read(0)
+    assert envelopes(first) == [0, 1, 2, 3, 4]
+    push(stream, range(5, 11))
+    # Frames 5-7 sit at the end of the ring, 8-10 at its start
+    second = stream.read(first["cursor"])
+    assert second["cursor"] == 11
+    assert envelopes(second) == [5, 6, 7, 8, 9, 10]
+    assert envelopes(stream.read(second["cursor"])) == []
+
+
+def test_slow_reader_gets_the_last_capacity_frames():
+    stream = LiveStream(channels=1, sample_rate=30, rate=30, capacity=8)
+    push(stream, range(5))
+    # More frames than the ring holds, in one block
+    push(stream, range(5, 25))
+    assert envelopes(stream.read(3)) == list(range(17, 25))
+    assert envelopes(stream.read(-5)) == list(range(17, 25))
+    assert envelopes(stream.read(100)) == []
+
+
+def test_frames_hold_the_peak_of_each_decimation_window():
+    stream = LiveStream(channels=1, sample_rate=120, rate=30, capacity=8)
+    push(stream, [1, 5, 2, 0, 3, 1])
+    assert envelopes(stream.read(0)) == [5]
+    push(stream, [4, 2])
+    assert envelopes(stream.read(1)) == [4]